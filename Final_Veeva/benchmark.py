@@ -0,0 +1,191 @@
+"""
+End-to-end latency benchmark for the Veeva service, run against mock_vault.py.
+
+Reports p50/p95/p99 latency, throughput and error counts for every endpoint at
+each concurrency level, so regressions in the Vault integration can be measured offline.
+
+Start both servers yourself (see mock_vault.py) and run:
+    python -m Final_Veeva.benchmark --base-url http://127.0.0.1:8000
+or let the benchmark launch them on free local ports:
+    python -m Final_Veeva.benchmark --start-servers --concurrency 1 8 32 --requests 200
+"""
+import os
+import sys
+import time
+import json
+import socket
+import random
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from typing import Optional, List, Tuple
+
+import httpx
+
+# Document IDs served by mock_vault.py (MOCK_VAULT_DOCS, default 200).
+DOC_IDS = list(range(1, int(os.getenv("MOCK_VAULT_DOCS", "200")) + 1))
+
+
+def _doc_id() -> int:
+    return random.choice(DOC_IDS)
+
+
+# name -> function building (method, path, kwargs) for one request
+ENDPOINTS = {
+    "check_regulatory_status": lambda: ("GET", f"/check_regulatory_status/{_doc_id()}", {}),
+    "check_regulatory_status_batch": lambda: ("POST", "/check_regulatory_status_batch", {"json": [str(i) for i in random.sample(DOC_IDS, min(50, len(DOC_IDS)))]}),
+    "verify_approval_audit": lambda: ("GET", f"/verify_approval_audit/{_doc_id()}", {}),
+    "query_documents": lambda: ("POST", "/query_documents", {"params": {"vql_query": "SELECT id, name__v, status__v FROM documents"}}),
+    "get_document_text": lambda: ("GET", f"/get_document_text/{_doc_id()}", {}),
+    "download_source": lambda: ("GET", f"/download_source/{_doc_id()}", {}),
+    "document_bundle": lambda: ("GET", f"/document_bundle/{_doc_id()}", {}),
+    "list_approved_documents": lambda: ("GET", "/list_approved_documents", {}),
+}
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an unsorted list."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(int(round(pct / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+async def run_level(client: httpx.AsyncClient, endpoint: str, concurrency: int, total: int) -> dict:
+    """Sends `total` requests to one endpoint with at most `concurrency` in flight."""
+    build = ENDPOINTS[endpoint]
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        nonlocal errors
+        method, path, kwargs = build()
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, **kwargs)
+                await response.aread()
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[one() for _ in range(total)])
+    elapsed = time.perf_counter() - started
+    return {
+        "endpoint": endpoint,
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50), 1),
+        "p95_ms": round(percentile(latencies, 95), 1),
+        "p99_ms": round(percentile(latencies, 99), 1),
+        "throughput_rps": round(total / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+async def run_benchmark(base_url: str, endpoints: List[str], levels: List[int], total: int, timeout: float) -> List[dict]:
+    results = []
+    limits = httpx.Limits(max_connections=max(levels), max_keepalive_connections=max(levels))
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        for endpoint in endpoints:
+            # One untimed request warms the session, caches and worker processes.
+            method, path, kwargs = ENDPOINTS[endpoint]()
+            await client.request(method, path, **kwargs)
+            for concurrency in levels:
+                result = await run_level(client, endpoint, concurrency, total)
+                results.append(result)
+                print_row(result)
+    return results
+
+
+def print_row(result: Optional[dict] = None):
+    columns = ["endpoint", "concurrency", "requests", "errors", "p50_ms", "p95_ms", "p99_ms", "throughput_rps"]
+    widths = [30, 11, 8, 6, 9, 9, 9, 14]
+    if result is None:
+        print("  ".join(name.ljust(width) for name, width in zip(columns, widths)))
+        return
+    print("  ".join(str(result[name]).ljust(width) for name, width in zip(columns, widths)))
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_port(port: int, deadline: float):
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server on port {port} did not start")
+
+
+def start_servers(cache_dir: str) -> Tuple[str, list]:
+    """Launches mock_vault.py and the service under uvicorn, wired to each other."""
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    vault_port, service_port = _free_port(), _free_port()
+    service_env = {
+        **os.environ,
+        "VEEVA_VAULT_SCHEME": "http",
+        "VEEVA_VAULT_DNS": f"127.0.0.1:{vault_port}",
+        "VEEVA_API_VERSION": "v24.1",
+        "VEEVA_USERNAME": "mock",
+        "VEEVA_PASSWORD": "mock",
+        "VEEVA_CACHE_DIR": cache_dir,
+    }
+    processes = [
+        subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "Final_Veeva.mock_vault:app", "--port", str(vault_port), "--log-level", "warning"],
+            cwd=repo_root,
+        ),
+        subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "Final_Veeva.main:app", "--port", str(service_port), "--log-level", "warning"],
+            cwd=repo_root, env=service_env,
+        ),
+    ]
+    deadline = time.time() + 30
+    _wait_for_port(vault_port, deadline)
+    _wait_for_port(service_port, deadline)
+    return f"http://127.0.0.1:{service_port}", processes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000", help="Veeva service to benchmark")
+    parser.add_argument("--start-servers", action="store_true", help="launch mock_vault.py and the service locally")
+    parser.add_argument("--endpoints", nargs="+", choices=sorted(ENDPOINTS), default=list(ENDPOINTS))
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=100, help="requests per endpoint and concurrency level")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--json", dest="json_path", help="also write the results to this file")
+    args = parser.parse_args()
+
+    processes = []
+    base_url = args.base_url
+    if args.start_servers:
+        base_url, processes = start_servers(tempfile.mkdtemp(prefix="veeva_bench_"))
+
+    try:
+        print_row()
+        results = asyncio.run(run_benchmark(base_url, args.endpoints, args.concurrency, args.requests, args.timeout))
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,30 @@
 import os
+import re
 import json
-import requests
-import io
+import time
+import random
+import hashlib
+from collections import deque, defaultdict, OrderedDict
+from datetime import datetime, timedelta, timezone
+import asyncio
+import httpx
 import fitz  # PyMuPDF
 import mimetypes
+import functools
+import multiprocessing
+import sqlite3
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
 
 
 from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from fastapi import Request, Response
 from fastapi import FastAPI, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Tuple, Union
 from dotenv import load_dotenv
 
 # Load environment variables from the .env file immediately
@@ -31,14 +45,76 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Snapshot-Generated-At", "Content-Range", "Accept-Ranges", "ETag", "X-Cache"],
 )
 
 # --- 3. Configuration (Load from Environment Variables) ---
 VAULT_DNS = os.getenv("VEEVA_VAULT_DNS")
+# Only changed for local testing against mock_vault.py (e.g. "http" with VEEVA_VAULT_DNS=127.0.0.1:9000).
+VAULT_SCHEME = os.getenv("VEEVA_VAULT_SCHEME", "https")
 API_VER = os.getenv("VEEVA_API_VERSION")
 VAULT_USERNAME = os.getenv("VEEVA_USERNAME")
 VAULT_PASSWORD = os.getenv("VEEVA_PASSWORD")
 VAULT_TIMEOUT = 30
+# Per-endpoint timeouts in seconds (VEEVA_TIMEOUT_<KIND>); VAULT_TIMEOUT stays the fallback.
+VAULT_TIMEOUTS = {
+    kind: float(os.getenv(f"VEEVA_TIMEOUT_{kind.upper()}", default))
+    for kind, default in {
+        "auth": "10", "query": "20", "metadata": "10", "text": "20",
+        "rendition": "60", "file": "60", "audit": "30",
+    }.items()
+}
+# Resilience layer around Vault calls.
+VAULT_RETRIES = int(os.getenv("VEEVA_RETRIES", "2"))
+RETRY_BACKOFF_BASE = float(os.getenv("VEEVA_RETRY_BACKOFF_BASE", "0.2"))
+RETRY_BACKOFF_CAP = float(os.getenv("VEEVA_RETRY_BACKOFF_CAP", "2"))
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+VAULT_HEDGING = os.getenv("VEEVA_HEDGING", "false").lower() == "true"
+BREAKER_THRESHOLD = int(os.getenv("VEEVA_BREAKER_THRESHOLD", "5"))
+BREAKER_COOLDOWN = float(os.getenv("VEEVA_BREAKER_COOLDOWN", "30"))
+# Vault sessions expire after a period of inactivity; refresh well before that.
+SESSION_TTL = int(os.getenv("VEEVA_SESSION_TTL", "1200"))
+# Connection pool for the shared Vault HTTP client (all calls go to one host).
+VAULT_MAX_CONNECTIONS = int(os.getenv("VEEVA_MAX_CONNECTIONS", "50"))
+VAULT_MAX_KEEPALIVE = int(os.getenv("VEEVA_MAX_KEEPALIVE", "20"))
+VAULT_KEEPALIVE_EXPIRY = float(os.getenv("VEEVA_KEEPALIVE_EXPIRY", "60"))
+VAULT_HTTP2 = os.getenv("VEEVA_HTTP2", "true").lower() == "true"
+# Per-document text extraction in list_approved_documents.
+LIST_CONCURRENCY = int(os.getenv("VEEVA_LIST_CONCURRENCY", "8"))
+LIST_DOC_TIMEOUT = float(os.getenv("VEEVA_LIST_DOC_TIMEOUT", "45"))
+# PDF parsing runs in worker processes; 0 falls back to a thread in this process.
+PDF_WORKERS = int(os.getenv("VEEVA_PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+PREVIEW_CHARS = 2000
+# Largest page batch per worker call when streaming text; batches grow 1, 2, 4... up to this.
+TEXT_PAGE_BATCH = int(os.getenv("VEEVA_TEXT_PAGE_BATCH", "8"))
+# Renditions are buffered in memory up to RENDITION_SPOOL_BYTES, then spilled to a temp file.
+# RENDITION_MEMORY_LIMIT caps in-memory buffering across all requests; RENDITION_MAX_BYTES caps one rendition.
+RENDITION_SPOOL_BYTES = int(os.getenv("VEEVA_RENDITION_SPOOL_BYTES", str(8 * 1024 * 1024)))
+RENDITION_MEMORY_LIMIT = int(os.getenv("VEEVA_RENDITION_MEMORY_LIMIT", str(128 * 1024 * 1024)))
+RENDITION_MAX_BYTES = int(os.getenv("VEEVA_RENDITION_MAX_BYTES", str(1024 * 1024 * 1024)))
+# On-disk cache of extracted document text, keyed by document ID + Vault version.
+CACHE_DIR = os.getenv("VEEVA_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".veeva_cache"))
+TEXT_CACHE_MAX_BYTES = int(os.getenv("VEEVA_TEXT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+# How long a cached text is served without asking Vault whether the version changed.
+TEXT_CACHE_REVALIDATE = int(os.getenv("VEEVA_TEXT_CACHE_REVALIDATE", "3600"))
+# Document IDs per VQL query in /check_regulatory_status_batch.
+BATCH_STATUS_CHUNK = int(os.getenv("VEEVA_BATCH_STATUS_CHUNK", "250"))
+# In-memory cache of /query_documents pages, keyed on the normalized VQL (or cursor).
+QUERY_CACHE_TTL = int(os.getenv("VEEVA_QUERY_CACHE_TTL", "60"))
+QUERY_CACHE_MAX_BYTES = int(os.getenv("VEEVA_QUERY_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+# Optional on-disk cache of downloaded source files (disabled unless a directory is set).
+BLOB_CACHE_DIR = os.getenv("VEEVA_BLOB_CACHE_DIR")
+BLOB_CACHE_MAX_BYTES = int(os.getenv("VEEVA_BLOB_CACHE_MAX_BYTES", str(2 * 1024 * 1024 * 1024)))
+# Background pre-warming of list_approved_documents snapshots (0 disables it).
+PREWARM_INTERVAL = int(os.getenv("VEEVA_PREWARM_INTERVAL", "600"))
+PREWARM_STATUSES = [v.strip() for v in os.getenv("VEEVA_PREWARM_STATUSES", "Approved").split(",") if v.strip()]
+# Rows per page when a listing is served from a snapshot; Vault's default VQL page size, like the live path.
+SNAPSHOT_PAGE_SIZE = int(os.getenv("VEEVA_SNAPSHOT_PAGE_SIZE", "1000"))
+# Local audit trail index: background sync interval (0 disables it) and date window per sync request.
+AUDIT_SYNC_INTERVAL = int(os.getenv("VEEVA_AUDIT_SYNC_INTERVAL", "300"))
+AUDIT_SYNC_WINDOW_DAYS = int(os.getenv("VEEVA_AUDIT_SYNC_WINDOW_DAYS", "30"))
+# A lookup miss triggers an extra incremental sync when the index is older than this.
+AUDIT_MISS_RESYNC = int(os.getenv("VEEVA_AUDIT_MISS_RESYNC", "30"))
 
 # --- 4. Define Response Schemas (Pydantic Models) ---
 
@@ -75,191 +151,1721 @@ class TextContentResponse(BaseModel):
     asset_type: str        # New field
     text_content: str
     status: str
+    cache_status: Optional[str] = None  # HIT, REVALIDATED or MISS
+    page_start: Optional[int] = None
+    page_end: Optional[int] = None
+    page_count: Optional[int] = None
+
+class DocumentBundle(BaseModel):
+    """Everything the regulatory hub shows for one document."""
+    document_id: str
+    file_name: Optional[str] = None
+    asset_type: Optional[str] = None
+    regulatory_status: Optional[RegulatoryStatus] = None
+    text: Optional[TextContentResponse] = None
+    approval_audit: Optional[ApprovalVerification] = None
+    timings_ms: dict = {}
+    errors: dict = {}
+
+class DocumentPage(BaseModel):
+    document_id: str
+    page: int
+    page_count: int
+    text: str
     
-# --- 5. Authentication Helper Function ---
-def get_session_id():
-    """Authenticates with Veeva Vault and returns a Session ID."""
+# --- 5. Shared HTTP Client and Authentication ---
+http_client: Optional[httpx.AsyncClient] = None
+
+
+def _http2_supported() -> bool:
+    """httpx only negotiates HTTP/2 when the optional `h2` package is installed."""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Returns the process-wide keep-alive client used for every Vault call."""
+    global http_client
+    if http_client is None:
+        http_client = httpx.AsyncClient(
+            http2=VAULT_HTTP2 and _http2_supported(),
+            timeout=VAULT_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=VAULT_MAX_CONNECTIONS,
+                max_keepalive_connections=VAULT_MAX_KEEPALIVE,
+                keepalive_expiry=VAULT_KEEPALIVE_EXPIRY,
+            ),
+        )
+    return http_client
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    global http_client
+    if http_client is not None:
+        await http_client.aclose()
+        http_client = None
+
+
+async def _authenticate():
+    """Authenticates with Veeva Vault and returns a fresh Session ID."""
     if not all([VAULT_USERNAME, VAULT_PASSWORD, VAULT_DNS, API_VER]):
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Configuration error: Missing credentials in .env file."
         )
 
-    auth_url = f"https://{VAULT_DNS}/api/{API_VER}/auth"
+    auth_url = f"{VAULT_SCHEME}://{VAULT_DNS}/api/{API_VER}/auth"
     headers = {"Content-Type": "application/x-www-form-urlencoded", "Accept": "application/json"}
     payload = {"username": VAULT_USERNAME, "password": VAULT_PASSWORD}
 
     try:
-        response = requests.post(auth_url, data=payload, headers=headers, timeout=VAULT_TIMEOUT)
+        response = await get_http_client().post(auth_url, data=payload, headers=headers, timeout=VAULT_TIMEOUTS["auth"])
         response.raise_for_status()
         auth_data = response.json()
-        if auth_data.get("responseStatus") == "SUCCESS":
-            return auth_data.get("sessionId")
-        raise HTTPException(status_code=401, detail="Vault Authentication Failed.")
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"Connectivity Error: {str(e)}")
 
+    if auth_data.get("responseStatus") == "SUCCESS":
+        return auth_data.get("sessionId")
+    raise HTTPException(status_code=401, detail="Vault Authentication Failed.")
+
+
+class VaultSessionManager:
+    """
+    Caches the Vault Session ID shared by every handler.
+    The session is refreshed once it is older than `ttl` seconds or when Vault
+    rejects it; concurrent callers wait on a single in-flight re-auth.
+    """
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self._session_id: Optional[str] = None
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.invalidations = 0
+
+    def _is_valid(self) -> bool:
+        return self._session_id is not None and time.monotonic() < self._expires_at
+
+    async def get(self) -> str:
+        if self._is_valid():
+            self.hits += 1
+            return self._session_id
+
+        self.misses += 1
+        async with self._lock:
+            # Another request may have refreshed the session while we waited.
+            if self._is_valid():
+                return self._session_id
+            self._session_id = await _authenticate()
+            self._expires_at = time.monotonic() + self.ttl
+            self.refreshes += 1
+            return self._session_id
+
+    def invalidate(self, session_id: str):
+        """Drops the cached session if it is still the one Vault rejected."""
+        if session_id == self._session_id:
+            self._session_id = None
+            self._expires_at = 0.0
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "invalidations": self.invalidations,
+            "session_age_seconds": round(self.ttl - (self._expires_at - time.monotonic()), 1) if self._is_valid() else None,
+        }
+
+
+vault_session = VaultSessionManager(SESSION_TTL)
+
+
+async def get_session_id() -> str:
+    """Returns the cached Vault Session ID, authenticating only when needed."""
+    return await vault_session.get()
+
+
+def is_invalid_session(response) -> bool:
+    """True when Vault rejected the request because the session expired."""
+    if "application/json" not in response.headers.get("Content-Type", ""):
+        return False
+    try:
+        body = response.json()
+    except ValueError:
+        return False
+    if not isinstance(body, dict) or body.get("responseStatus") != "FAILURE":
+        return False
+    return any(err.get("type") == "INVALID_SESSION_ID" for err in body.get("errors") or [])
+
+
+# --- Resilience: Timeouts, Retries, Hedging and Circuit Breaker ---
+def vault_endpoint_kind(url: str) -> str:
+    """Groups Vault URLs so each kind gets its own timeout and latency history."""
+    path = httpx.URL(url).path
+    if path.endswith("/auth"):
+        return "auth"
+    if "/audittrail/" in path:
+        return "audit"
+    if "/query" in path:
+        return "query"
+    if path.endswith("/text"):
+        return "text"
+    if "/renditions/" in path:
+        return "rendition"
+    if path.endswith("/file"):
+        return "file"
+    return "metadata"
+
+
+class LatencyTracker:
+    """Recent successful latencies per endpoint kind, used to pick the hedging delay."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples = {}
+        self._window = window
+
+    def record(self, kind: str, seconds: float):
+        self._samples.setdefault(kind, deque(maxlen=self._window)).append(seconds)
+
+    def p95(self, kind: str) -> Optional[float]:
+        samples = self._samples.get(kind)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[int(len(ordered) * 0.95) - 1]
+
+    def stats(self) -> dict:
+        return {kind: round(self.p95(kind) * 1000, 1) if self.p95(kind) else None for kind in self._samples}
+
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive Vault failures and fails fast for `cooldown` seconds.
+    After the cooldown a single trial call is let through (half-open); its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+        self._trial_started: Optional[float] = None
+
+    def before_call(self):
+        if self.state == "closed":
+            return
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.cooldown:
+            self.state = "half_open"
+        # A trial that never reported back (cancelled, non-Vault error) is replaced after another cooldown.
+        trial_stale = self._trial_started is None or time.monotonic() - self._trial_started >= self.cooldown
+        if self.state == "half_open" and trial_stale:
+            self._trial_started = time.monotonic()
+            return
+        self.rejected += 1
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Vault is degraded; failing fast until it recovers."
+        )
+
+    def record_success(self):
+        self.state = "closed"
+        self.failures = 0
+        self._trial_started = None
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_started = None
+        if self.state == "half_open" or self.failures >= self.threshold:
+            if self.state != "open":
+                self.times_opened += 1
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> dict:
+        return {"state": self.state, "consecutive_failures": self.failures,
+                "times_opened": self.times_opened, "rejected": self.rejected}
+
+
+vault_latency = LatencyTracker()
+vault_breaker = CircuitBreaker(BREAKER_THRESHOLD, BREAKER_COOLDOWN)
+resilience_counters = {"retries": 0, "hedges": 0, "hedge_wins": 0}
+
+
+def _backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff."""
+    return random.uniform(0, min(RETRY_BACKOFF_CAP, RETRY_BACKOFF_BASE * (2 ** attempt)))
+
+
+async def _send_with_session(method: str, url: str, headers: Optional[dict], stream: bool, timeout: float, kwargs: dict):
+    """
+    Sends one request with the cached session attached.
+    If Vault reports INVALID_SESSION_ID, the session is refreshed and the call retried once.
+    """
+    client = get_http_client()
+    for attempt in range(2):
+        session_id = await get_session_id()
+        request = client.build_request(
+            method, url, headers={**(headers or {}), "Authorization": session_id}, timeout=timeout, **kwargs
+        )
+        response = await client.send(request, stream=stream)
+        if stream and "application/json" in response.headers.get("Content-Type", ""):
+            # JSON bodies are small error payloads; read them so they can be inspected.
+            await response.aread()
+        if attempt == 0 and is_invalid_session(response):
+            await response.aclose()
+            vault_session.invalidate(session_id)
+            continue
+        return response
+
+
+async def _send_hedged(kind: str, send):
+    """Starts a second identical request if the first is slower than this endpoint's p95; first answer wins."""
+    first = asyncio.create_task(send())
+    delay = vault_latency.p95(kind)
+    if delay is None:
+        return await first
+    done, _ = await asyncio.wait({first}, timeout=delay)
+    if done:
+        return first.result()
+
+    resilience_counters["hedges"] += 1
+    second = asyncio.create_task(send())
+    pending = {first, second}
+    error = None
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if task.exception() is None:
+                for other in pending:
+                    other.cancel()
+                if task is second:
+                    resilience_counters["hedge_wins"] += 1
+                return task.result()
+            error = task.exception()
+    raise error
+
+
+async def vault_request(method: str, url: str, headers: Optional[dict] = None, stream: bool = False, **kwargs):
+    """
+    Sends a request to Vault through the resilience layer.
+    - Each endpoint kind has its own timeout (VAULT_TIMEOUTS).
+    - GETs are retried with jittered backoff on connection errors, timeouts and 429/5xx answers.
+    - Non-streaming GETs may be hedged once they run past the endpoint's recent p95.
+    - While the circuit breaker is open, calls fail immediately with 503.
+    With stream=True the body is left unread; the caller must close the response.
+    """
+    kind = vault_endpoint_kind(url)
+    timeout = VAULT_TIMEOUTS.get(kind, VAULT_TIMEOUT)
+    idempotent = method.upper() == "GET"
+    attempts = 1 + (VAULT_RETRIES if idempotent else 0)
+
+    def send():
+        return _send_with_session(method, url, headers, stream, timeout, kwargs)
+
+    for attempt in range(attempts):
+        vault_breaker.before_call()
+        started = time.monotonic()
+        try:
+            if idempotent and not stream and VAULT_HEDGING:
+                response = await _send_hedged(kind, send)
+            else:
+                response = await send()
+        except httpx.TransportError:
+            vault_breaker.record_failure()
+            if attempt == attempts - 1:
+                raise
+            resilience_counters["retries"] += 1
+            await asyncio.sleep(_backoff_delay(attempt))
+            continue
+
+        if response.status_code in RETRYABLE_STATUSES:
+            vault_breaker.record_failure()
+            if attempt < attempts - 1:
+                await response.aclose()
+                resilience_counters["retries"] += 1
+                await asyncio.sleep(_backoff_delay(attempt))
+                continue
+            return response
+
+        vault_breaker.record_success()
+        vault_latency.record(kind, time.monotonic() - started)
+        return response
+
+
+# --- Request Coalescing ---
+class SingleFlight:
+    """
+    Lets concurrent identical requests share one in-flight result. Keys are
+    (endpoint, doc_id) tuples; counters are kept per endpoint.
+    """
+
+    def __init__(self):
+        self._flights = {}
+        self.leaders = defaultdict(int)
+        self.coalesced = defaultdict(int)
+
+    def join(self, key: tuple) -> Optional[asyncio.Future]:
+        """The in-flight future for key, or None when nothing is running."""
+        flight = self._flights.get(key)
+        if flight is not None:
+            self.coalesced[key[0]] += 1
+        return flight
+
+    def lead(self, key: tuple) -> asyncio.Future:
+        """Registers the caller as the one doing the work; settle it with finish()."""
+        flight = asyncio.get_running_loop().create_future()
+        self._flights[key] = flight
+        self.leaders[key[0]] += 1
+        return flight
+
+    def finish(self, key: tuple, flight: asyncio.Future, result=None):
+        """Publishes the leader's result; safe to call more than once."""
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if not flight.done():
+            flight.set_result(result)
+
+    async def do(self, key: tuple, factory):
+        """Runs factory() once per key at a time; followers await the leader's result or exception."""
+        flight = self.join(key)
+        if flight is None:
+            flight = asyncio.ensure_future(factory())
+            self._flights[key] = flight
+            self.leaders[key[0]] += 1
+            flight.add_done_callback(lambda _: self._flights.pop(key, None))
+        # A caller that disconnects must not cancel the work the others are waiting for.
+        return await asyncio.shield(flight)
+
+    def stats(self) -> dict:
+        return {
+            endpoint: {"leaders": self.leaders[endpoint], "coalesced": self.coalesced[endpoint]}
+            for endpoint in sorted(set(self.leaders) | set(self.coalesced))
+        }
+
+
+document_flights = SingleFlight()
+
+
+def discard_task(task: asyncio.Task):
+    """Cancels a task whose result is no longer needed, without leaving its exception unretrieved."""
+    task.cancel()
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+
+@app.get("/stats")
+async def service_stats():
+    """Runtime counters for the Vault integration."""
+    return {
+        "session": vault_session.stats(),
+        "text_cache": get_text_cache().stats(),
+        "audit_index": get_audit_index().stats(),
+        "blob_cache": get_blob_cache().stats() if get_blob_cache() else None,
+        "listing_snapshots": {name: snapshot.stats() for name, snapshot in listing_snapshots.items()},
+        "query_cache": query_cache.stats(),
+        "coalescing": document_flights.stats(),
+        "resilience": {
+            **resilience_counters,
+            "circuit_breaker": vault_breaker.stats(),
+            "p95_ms": vault_latency.stats(),
+        },
+    }
+
+# --- PDF Text Extraction (Process Pool) ---
+pdf_pool: Optional[ProcessPoolExecutor] = None
+
+
+def open_pdf(pdf_source: Union[bytes, str]):
+    """Opens a PDF held in memory (bytes) or spilled to disk (file path)."""
+    if isinstance(pdf_source, str):
+        return fitz.open(pdf_source, filetype="pdf")
+    return fitz.open(stream=pdf_source, filetype="pdf")
+
+
+def extract_pdf_text(pdf_source: Union[bytes, str], max_chars: Optional[int] = None, max_pages: Optional[int] = None) -> str:
+    """
+    Extracts text page by page, stopping as soon as the page or character budget is met.
+    Runs inside a worker process, so it must stay a plain module-level function.
+    """
+    parts = []
+    total_chars = 0
+    with open_pdf(pdf_source) as doc:
+        for page_no, page in enumerate(doc):
+            if max_pages is not None and page_no >= max_pages:
+                break
+            text = page.get_text()
+            parts.append(text)
+            total_chars += len(text)
+            if max_chars is not None and total_chars >= max_chars:
+                break
+    extracted = "".join(parts)
+    return extracted[:max_chars] if max_chars is not None else extracted
+
+
+def extract_pdf_pages(pdf_source: Union[bytes, str], page_start: int = 1, page_end: Optional[int] = None) -> Tuple[int, List[Tuple[int, str]]]:
+    """
+    Extracts pages page_start..page_end (1-based, inclusive) and returns
+    (page_count, [(page_no, text), ...]). Pages past the end of the document are ignored.
+    """
+    with open_pdf(pdf_source) as doc:
+        page_count = doc.page_count
+        last = page_count if page_end is None else min(page_end, page_count)
+        pages = [(page_no, doc[page_no - 1].get_text()) for page_no in range(page_start, last + 1)]
+    return page_count, pages
+
+
+def get_pdf_pool() -> ProcessPoolExecutor:
+    global pdf_pool
+    if pdf_pool is None:
+        # 'spawn' avoids forking a process that already runs the event loop and thread pool.
+        pdf_pool = ProcessPoolExecutor(max_workers=PDF_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return pdf_pool
+
+
+async def run_pdf_extraction(pdf_source: Union[bytes, str], max_chars: Optional[int] = None, max_pages: Optional[int] = None) -> str:
+    """Runs extract_pdf_text off the event loop."""
+    return await _run_pdf_job(functools.partial(extract_pdf_text, pdf_source, max_chars=max_chars, max_pages=max_pages))
+
+
+async def run_pdf_page_extraction(pdf_source: Union[bytes, str], page_start: int = 1, page_end: Optional[int] = None) -> Tuple[int, List[Tuple[int, str]]]:
+    """Runs extract_pdf_pages off the event loop."""
+    return await _run_pdf_job(functools.partial(extract_pdf_pages, pdf_source, page_start=page_start, page_end=page_end))
+
+
+async def _run_pdf_job(job):
+    if PDF_WORKERS <= 0:
+        return await asyncio.to_thread(job)
+    return await asyncio.get_running_loop().run_in_executor(get_pdf_pool(), job)
+
+
+class RenditionSpool:
+    """
+    Receives a rendition chunk by chunk without ever holding more than
+    RENDITION_SPOOL_BYTES of it in memory. Large files, or any file arriving while the
+    process-wide memory budget is used up, go to a named temp file that workers open by path.
+    """
+
+    memory_in_use = 0
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._file = None
+        self.size = 0
+
+    def write(self, chunk: bytes):
+        self.size += len(chunk)
+        if self.size > RENDITION_MAX_BYTES:
+            raise HTTPException(status_code=413, detail="Rendition exceeds the configured size limit.")
+        if self._file is None:
+            fits_spool = len(self._buffer) + len(chunk) <= RENDITION_SPOOL_BYTES
+            fits_budget = RenditionSpool.memory_in_use + len(chunk) <= RENDITION_MEMORY_LIMIT
+            if fits_spool and fits_budget:
+                self._buffer += chunk
+                RenditionSpool.memory_in_use += len(chunk)
+                return
+            self._spill()
+        self._file.write(chunk)
+
+    def _spill(self):
+        self._file = tempfile.NamedTemporaryFile(prefix="rendition_", suffix=".pdf", delete=False)
+        self._file.write(self._buffer)
+        self._release_buffer()
+
+    def _release_buffer(self):
+        RenditionSpool.memory_in_use -= len(self._buffer)
+        self._buffer = bytearray()
+
+    @property
+    def on_disk(self) -> bool:
+        return self._file is not None
+
+    def source(self) -> Union[bytes, str]:
+        """What to hand to extract_pdf_text: the bytes, or the temp file's path."""
+        if self._file is not None:
+            self._file.flush()
+            return self._file.name
+        return bytes(self._buffer)
+
+    def close(self):
+        """Safe to call more than once: the stream's generator and its BackgroundTask may both close it."""
+        self._release_buffer()
+        if self._file is not None:
+            self._file.close()
+            try:
+                os.remove(self._file.name)
+            except OSError:
+                pass
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+async def fetch_rendition(doc_id: str, headers: dict) -> Optional[RenditionSpool]:
+    """
+    Streams the viewable rendition into a RenditionSpool; None when the document has none (404).
+    Any other failure raises, so callers never mistake a Vault outage for a missing rendition.
+    """
+    rendition_url = f"{VAULT_SCHEME}://{VAULT_DNS}/api/{API_VER}/objects/documents/{doc_id}/renditions/viewable_rendition__v"
+    response = await vault_request("GET", rendition_url, headers=headers, stream=True)
+    try:
+        if response.status_code == 404:
+            return None
+        if response.status_code != 200:
+            raise HTTPException(status_code=502, detail=f"Rendition request failed with HTTP {response.status_code}")
+        spool = RenditionSpool()
+        try:
+            async for chunk in response.aiter_bytes(chunk_size=256 * 1024):
+                if spool.on_disk:
+                    await asyncio.to_thread(spool.write, chunk)
+                else:
+                    spool.write(chunk)
+        except BaseException:
+            spool.close()
+            raise
+        return spool
+    finally:
+        await response.aclose()
+
+
+@app.on_event("shutdown")
+async def shutdown_pdf_pool():
+    global pdf_pool
+    if pdf_pool is not None:
+        pdf_pool.shutdown(wait=False, cancel_futures=True)
+        pdf_pool = None
+
+
+# --- Extracted Text Cache (SQLite) ---
+def document_version(doc: dict) -> str:
+    """Builds the cache version key from Vault document metadata."""
+    modified = doc.get("version_modified_date__v") or doc.get("document_modified_date__v") or ""
+    major = doc.get("major_version_number__v", "")
+    minor = doc.get("minor_version_number__v", "")
+    return f"{major}.{minor}@{modified}"
+
+
+class TextCache:
+    """
+    Size-bounded LRU store for extracted text.
+    `kind` separates full texts from the short previews used by listings.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS text_cache (
+                doc_id TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                version TEXT NOT NULL,
+                file_name TEXT,
+                asset_type TEXT,
+                status TEXT,
+                text_content TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (doc_id, kind, version)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_text_cache_lru ON text_cache (last_access)")
+        self._conn.commit()
+
+    def _get(self, doc_id: str, kind: str, version: Optional[str], max_age: Optional[float]) -> Optional[dict]:
+        sql = "SELECT version, file_name, asset_type, status, text_content FROM text_cache WHERE doc_id = ? AND kind = ?"
+        params = [doc_id, kind]
+        if version is not None:
+            sql += " AND version = ?"
+            params.append(version)
+        if max_age is not None:
+            sql += " AND stored_at >= ?"
+            params.append(time.time() - max_age)
+        sql += " ORDER BY stored_at DESC LIMIT 1"
+
+        with self._lock:
+            row = self._conn.execute(sql, params).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            now = time.time()
+            if version is not None:
+                # A version match means Vault just confirmed the entry, so restart its freshness window.
+                self._conn.execute(
+                    "UPDATE text_cache SET last_access = ?, stored_at = ? WHERE doc_id = ? AND kind = ? AND version = ?",
+                    (now, now, doc_id, kind, row[0])
+                )
+            else:
+                self._conn.execute(
+                    "UPDATE text_cache SET last_access = ? WHERE doc_id = ? AND kind = ? AND version = ?",
+                    (now, doc_id, kind, row[0])
+                )
+            self._conn.commit()
+        return {"file_name": row[1], "asset_type": row[2], "status": row[3], "text_content": row[4]}
+
+    def _put(self, doc_id: str, kind: str, version: str, text_content: str,
+             file_name: Optional[str], asset_type: Optional[str], status: Optional[str]):
+        size = len(text_content.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            # Older versions of the same document are dead weight once a new one is stored.
+            self._conn.execute("DELETE FROM text_cache WHERE doc_id = ? AND kind = ? AND version != ?", (doc_id, kind, version))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO text_cache VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (doc_id, kind, version, file_name, asset_type, status, text_content, size, now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM text_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for doc_id, kind, version, size in self._conn.execute(
+            "SELECT doc_id, kind, version, size FROM text_cache ORDER BY last_access ASC"
+        ).fetchall():
+            self._conn.execute("DELETE FROM text_cache WHERE doc_id = ? AND kind = ? AND version = ?", (doc_id, kind, version))
+            self.evictions += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    async def get(self, doc_id: str, kind: str, version: str) -> Optional[dict]:
+        """Entry stored for exactly this document version."""
+        return await asyncio.to_thread(self._get, doc_id, kind, version, None)
+
+    async def get_fresh(self, doc_id: str, kind: str) -> Optional[dict]:
+        """Latest entry for the document if it was confirmed within TEXT_CACHE_REVALIDATE seconds."""
+        return await asyncio.to_thread(self._get, doc_id, kind, None, TEXT_CACHE_REVALIDATE)
+
+    async def put(self, doc_id: str, kind: str, version: str, text_content: str,
+                  file_name: Optional[str] = None, asset_type: Optional[str] = None, status: Optional[str] = None):
+        await asyncio.to_thread(self._put, doc_id, kind, version, text_content, file_name, asset_type, status)
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM text_cache").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "entries": entries, "bytes": size, "max_bytes": self.max_bytes}
+
+
+text_cache: Optional[TextCache] = None
+
+
+def get_text_cache() -> TextCache:
+    global text_cache
+    if text_cache is None:
+        text_cache = TextCache(os.path.join(CACHE_DIR, "text_cache.db"), TEXT_CACHE_MAX_BYTES)
+    return text_cache
+
+
+# --- Local Audit Trail Index (SQLite) ---
+def is_approval_event(entry: dict) -> bool:
+    """BROADENED LOGIC: Check for Workflow Approve OR State Change to Approved"""
+    event = str(entry.get('event_type__v', '')).lower()
+    action = str(entry.get('action', '')).lower()
+    desc = str(entry.get('event_description', '')).lower()
+
+    is_workflow_approve = "workflow" in event and "approve" in action
+    is_state_change_approve = "state change" in event and "approved" in desc
+    return is_workflow_approve or is_state_change_approve
+
+
+class AuditIndex:
+    """
+    Local copy of the document audit trail, indexed by doc_id and event type.
+    `synced_until` records how far the index is known to be complete.
+    """
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS audit_events (
+                record_id TEXT PRIMARY KEY,
+                doc_id TEXT,
+                item_id TEXT,
+                event_type TEXT,
+                is_approval INTEGER NOT NULL,
+                user_name TEXT,
+                role TEXT,
+                timestamp TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_audit_doc_event ON audit_events (doc_id, event_type);
+            CREATE INDEX IF NOT EXISTS idx_audit_item_event ON audit_events (item_id, event_type);
+            CREATE INDEX IF NOT EXISTS idx_audit_doc_approval ON audit_events (doc_id, is_approval, timestamp);
+            CREATE INDEX IF NOT EXISTS idx_audit_item_approval ON audit_events (item_id, is_approval, timestamp);
+            CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT);
+            """
+        )
+        self._conn.commit()
+        self.syncs = 0
+        self.last_sync_seconds: Optional[float] = None
+        self.last_synced_at: Optional[float] = None
+
+    def synced_until(self) -> Optional[datetime]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM sync_state WHERE key = 'synced_until'").fetchone()
+        return datetime.fromisoformat(row[0]) if row else None
+
+    def add_records(self, records: List[dict]):
+        rows = []
+        for entry in records:
+            record_id = entry.get('id')
+            if record_id is None:
+                record_id = hashlib.sha1(json.dumps(entry, sort_keys=True).encode()).hexdigest()
+            rows.append((
+                str(record_id),
+                str(entry.get('doc_id')) if entry.get('doc_id') is not None else None,
+                str(entry.get('item_id')) if entry.get('item_id') is not None else None,
+                str(entry.get('event_type__v', '')).lower(),
+                1 if is_approval_event(entry) else 0,
+                entry.get('user_name__v'),
+                entry.get('role__v'),
+                entry.get('timestamp'),
+            ))
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO audit_events VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._conn.commit()
+
+    def mark_synced(self, until: datetime):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sync_state (key, value) VALUES ('synced_until', ?)", (until.isoformat(),)
+            )
+            self._conn.commit()
+
+    def find_approval(self, doc_id: str) -> Optional[dict]:
+        """Earliest approval event recorded for the document."""
+        sql = """
+            SELECT user_name, role, timestamp FROM audit_events
+            WHERE {column} = ? AND is_approval = 1
+            ORDER BY timestamp ASC LIMIT 1
+        """
+        with self._lock:
+            rows = [
+                self._conn.execute(sql.format(column=column), (doc_id,)).fetchone()
+                for column in ("doc_id", "item_id")
+            ]
+        rows = [row for row in rows if row is not None]
+        if not rows:
+            return None
+        user_name, role, timestamp = min(rows, key=lambda row: row[2] or "")
+        return {"user_name": user_name, "role": role, "timestamp": timestamp}
+
+    def stats(self) -> dict:
+        with self._lock:
+            records = self._conn.execute("SELECT COUNT(*) FROM audit_events").fetchone()[0]
+        synced_until = self.synced_until()
+        return {
+            "records": records,
+            "synced_until": synced_until.isoformat() if synced_until else None,
+            "syncs": self.syncs,
+            "last_sync_seconds": self.last_sync_seconds,
+        }
+
+
+audit_index: Optional[AuditIndex] = None
+audit_sync_lock = asyncio.Lock()
+audit_sync_task: Optional[asyncio.Task] = None
+
+
+def get_audit_index() -> AuditIndex:
+    global audit_index
+    if audit_index is None:
+        audit_index = AuditIndex(os.path.join(CACHE_DIR, "audit_index.db"))
+    return audit_index
+
+
+def _vault_timestamp(value: datetime) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+async def _load_audit_pages(url: str) -> int:
+    """Reads one audit trail query, following Vault's next_page links, into the index."""
+    index = get_audit_index()
+    headers = {"Accept": "application/json"}
+    loaded = 0
+    while url:
+        response = await vault_request("GET", url, headers=headers)
+        response.raise_for_status()
+        body = response.json()
+        records = body.get('data') or []
+        await asyncio.to_thread(index.add_records, records)
+        loaded += len(records)
+        next_page = (body.get('responseDetails') or {}).get('next_page')
+        url = f"{VAULT_SCHEME}://{VAULT_DNS}{next_page}" if next_page else None
+    return loaded
+
+
+async def sync_audit_index() -> int:
+    """
+    Brings the index up to date: a full load on first use, then date windows
+    from the last synced point. Concurrent callers share one sync.
+    """
+    index = get_audit_index()
+    requested_at = time.monotonic()
+    async with audit_sync_lock:
+        # Someone else finished a sync while we were waiting for the lock.
+        if index.last_synced_at is not None and index.last_synced_at >= requested_at:
+            return 0
+
+        started = time.monotonic()
+        sync_to = datetime.now(timezone.utc).replace(microsecond=0)
+        base_url = f"{VAULT_SCHEME}://{VAULT_DNS}/api/{API_VER}/audittrail/document_audit_trail"
+        synced_until = await asyncio.to_thread(index.synced_until)
+        loaded = 0
+
+        if synced_until is None:
+            loaded += await _load_audit_pages(f"{base_url}?all_dates=true")
+        else:
+            # Overlap slightly so events written around the previous cut-off are not missed.
+            window_start = synced_until - timedelta(minutes=5)
+            while window_start < sync_to:
+                window_end = min(window_start + timedelta(days=AUDIT_SYNC_WINDOW_DAYS), sync_to)
+                loaded += await _load_audit_pages(
+                    f"{base_url}?start_date={_vault_timestamp(window_start)}&end_date={_vault_timestamp(window_end)}"
+                )
+                window_start = window_end
+
+        await asyncio.to_thread(index.mark_synced, sync_to)
+        index.syncs += 1
+        index.last_synced_at = time.monotonic()
+        index.last_sync_seconds = round(index.last_synced_at - started, 3)
+        return loaded
+
+
+async def _audit_sync_loop():
+    while True:
+        try:
+            await sync_audit_index()
+        except Exception as e:
+            print(f"Audit index sync failed: {e}")
+        await asyncio.sleep(AUDIT_SYNC_INTERVAL)
+
+
+@app.on_event("startup")
+async def start_audit_sync():
+    global audit_sync_task
+    if AUDIT_SYNC_INTERVAL > 0 and all([VAULT_USERNAME, VAULT_PASSWORD, VAULT_DNS, API_VER]):
+        audit_sync_task = asyncio.create_task(_audit_sync_loop())
+
+
+@app.on_event("shutdown")
+async def stop_audit_sync():
+    if audit_sync_task is not None:
+        audit_sync_task.cancel()
+
+
 # --- 6. New Endpoint: The Approval Audit Check ---
 @app.get("/verify_approval_audit/{doc_id}", response_model=ApprovalVerification)
 async def verify_approval_audit(doc_id: str):
-    session_id = get_session_id()
-    audit_url = f"https://{VAULT_DNS}/api/{API_VER}/audittrail/document_audit_trail?all_dates=true"
-    
-    headers = {"Authorization": session_id, "Accept": "application/json"}
+    index = get_audit_index()
 
     try:
-        response = requests.get(audit_url, headers=headers, timeout=VAULT_TIMEOUT)
-        response.raise_for_status()
-        records = response.json().get('data', [])
-        
-        for entry in records:
-            doc_match = str(entry.get('item_id')) == doc_id or str(entry.get('doc_id')) == doc_id
-            
-            # BROADENED LOGIC: Check for Workflow Approve OR State Change to Approved
-            event = str(entry.get('event_type__v', '')).lower()
-            action = str(entry.get('action', '')).lower()
-            desc = str(entry.get('event_description', '')).lower()
-            
-            is_workflow_approve = "workflow" in event and "approve" in action
-            is_state_change_approve = "state change" in event and "approved" in desc
-
-            if doc_match and (is_workflow_approve or is_state_change_approve):
-                return ApprovalVerification(
-                    document_id=doc_id,
-                    verified=True,
-                    approver_name=entry.get('user_name__v'),
-                    approval_date=entry.get('timestamp'),
-                    role=entry.get('role__v') or "System/Admin",
-                    message="SUCCESS: Approval event (Workflow or State Change) found."
-                )
+        if index.last_synced_at is None:
+            await sync_audit_index()
+
+        entry = await asyncio.to_thread(index.find_approval, doc_id)
+        if entry is None and time.monotonic() - index.last_synced_at > AUDIT_MISS_RESYNC:
+            # The approval may have happened after the last background sync.
+            await sync_audit_index()
+            entry = await asyncio.to_thread(index.find_approval, doc_id)
+
+        if entry:
+            return ApprovalVerification(
+                document_id=doc_id,
+                verified=True,
+                approver_name=entry['user_name'],
+                approval_date=entry['timestamp'],
+                role=entry['role'] or "System/Admin",
+                message="SUCCESS: Approval event (Workflow or State Change) found."
+            )
         
         return ApprovalVerification(document_id=doc_id, verified=False, message="FAILED: No approval record found.")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=502, detail=str(e))
 
 # --- 7. Existing Endpoints ---
 
+def _check_cursor(cursor: str):
+    """Cursors are Vault next_page paths; refuse anything else so they cannot be used to reach other URLs."""
+    if not cursor.startswith(f"/api/{API_VER}/query/"):
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+
+async def fetch_vql_page(vql_query: Optional[str] = None, cursor: Optional[str] = None):
+    """Returns (rows, next_cursor) for the first page of a VQL query or the page a cursor points at."""
+    headers = {"Accept": "application/json"}
+    if cursor:
+        _check_cursor(cursor)
+        response = await vault_request("GET", f"{VAULT_SCHEME}://{VAULT_DNS}{cursor}", headers=headers)
+    else:
+        query_url = f"{VAULT_SCHEME}://{VAULT_DNS}/api/{API_VER}/query"
+        response = await vault_request("POST", query_url, data={"q": vql_query}, headers=headers)
+    response.raise_for_status()
+    body = response.json()
+    if body.get("responseStatus") == "FAILURE":
+        raise HTTPException(status_code=400, detail=body.get("errors"))
+    next_cursor = (body.get("responseDetails") or {}).get("next_page")
+    return body.get("data") or [], next_cursor
+
+
+async def iter_vql_pages(vql_query: Optional[str] = None, cursor: Optional[str] = None):
+    """Yields each page of rows, following Vault's next_page until the result set is exhausted."""
+    while True:
+        rows, cursor = await fetch_vql_page(vql_query, cursor)
+        yield rows
+        if not cursor:
+            break
+
+
+def ndjson_stream(results, background: Optional[BackgroundTask] = None):
+    """Wraps an async iterator of models as an NDJSON response; errors after the first byte become a final error line."""
+    async def body():
+        try:
+            async for result in results:
+                yield result.model_dump_json() + "\n"
+        except Exception as e:
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            yield json.dumps({"error": detail}) + "\n"
+    return StreamingResponse(body(), media_type="application/x-ndjson", background=background)
+
+
+def _query_result(d: dict) -> QueryResult:
+    return QueryResult(document_id=str(d['id']), name=d.get('name__v', 'N/A'), status_v=d.get('status__v', 'N/A'))
+
+
+# --- VQL Result Cache ---
+def normalize_vql(vql_query: str) -> str:
+    """Collapses whitespace outside quoted literals so trivially different spellings share a cache entry."""
+    parts = []
+    for i, part in enumerate(vql_query.strip().rstrip(";").split("'")):
+        # Even-numbered parts are outside quotes; literals are kept byte for byte.
+        parts.append(re.sub(r"\s+", " ", part) if i % 2 == 0 else part)
+    return "'".join(parts).strip()
+
+
+class QueryCacheEntry:
+    def __init__(self, results: List[dict], next_cursor: Optional[str]):
+        body = json.dumps({"results": results, "next_cursor": next_cursor}, sort_keys=True)
+        self.results = results
+        self.next_cursor = next_cursor
+        self.etag = f'"{hashlib.sha1(body.encode()).hexdigest()}"'
+        self.size = len(body)
+        self.stored_at = time.monotonic()
+
+    def max_age(self) -> int:
+        return max(int(QUERY_CACHE_TTL - (time.monotonic() - self.stored_at)), 0)
+
+
+class QueryCache:
+    """TTL + LRU cache of query pages, bounded by the serialized size of the stored results."""
+
+    def __init__(self, ttl: int, max_bytes: int):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: tuple) -> Optional[QueryCacheEntry]:
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry.stored_at >= self.ttl:
+            self._remove(key)
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: tuple, entry: QueryCacheEntry):
+        if self.ttl <= 0 or entry.size > self.max_bytes:
+            return
+        self._remove(key)
+        self._entries[key] = entry
+        self.bytes += entry.size
+        while self.bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _remove(self, key: tuple):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry.size
+
+    def invalidate(self, key: Optional[tuple] = None) -> int:
+        """Drops one entry, or everything when key is None; returns how many were dropped."""
+        if key is not None:
+            dropped = 1 if key in self._entries else 0
+            self._remove(key)
+            return dropped
+        dropped = len(self._entries)
+        self._entries.clear()
+        self.bytes = 0
+        return dropped
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+query_cache = QueryCache(QUERY_CACHE_TTL, QUERY_CACHE_MAX_BYTES)
+
+
+def query_cache_key(vql_query: Optional[str], cursor: Optional[str]) -> tuple:
+    return ("cursor", cursor) if cursor else ("vql", normalize_vql(vql_query))
+
+
+async def _fetch_query_page(key: tuple, vql_query: Optional[str], cursor: Optional[str]) -> QueryCacheEntry:
+    rows, next_cursor = await fetch_vql_page(vql_query, cursor)
+    entry = QueryCacheEntry([_query_result(d).model_dump() for d in rows], next_cursor)
+    query_cache.put(key, entry)
+    return entry
+
+
 @app.post("/query_documents", response_model=List[QueryResult])
-async def query_documents(vql_query: str):
-    session_id = get_session_id()
-    query_url = f"https://{VAULT_DNS}/api/{API_VER}/query"
-    headers = {"Authorization": session_id, "Accept": "application/json"}
-    payload = {"q": vql_query}
+async def query_documents(request: Request, response: Response, vql_query: Optional[str] = None, cursor: Optional[str] = None, stream: bool = False):
+    """
+    Returns one page of results and the next page's cursor in the X-Next-Cursor header.
+    Pages are cached for VEEVA_QUERY_CACHE_TTL seconds and carry an ETag; a matching
+    If-None-Match gets a 304. With stream=true every page is sent as NDJSON, one
+    QueryResult per line, straight from Vault.
+    """
+    if not vql_query and not cursor:
+        raise HTTPException(status_code=400, detail="Provide vql_query or cursor.")
+    if cursor:
+        _check_cursor(cursor)
+
+    if stream:
+        async def results():
+            async for rows in iter_vql_pages(vql_query, cursor):
+                for d in rows:
+                    yield _query_result(d)
+        return ndjson_stream(results())
 
     try:
-        response = requests.post(query_url, data=payload, headers=headers, timeout=VAULT_TIMEOUT)
-        response.raise_for_status()
-        data = response.json()
-        return [QueryResult(document_id=str(d['id']), name=d.get('name__v', 'N/A'), status_v=d.get('status__v', 'N/A')) for d in data.get('data', [])]
+        key = query_cache_key(vql_query, cursor)
+        entry = query_cache.get(key)
+        cache_status = "HIT"
+        if entry is None:
+            cache_status = "MISS"
+            # Identical queries already on their way to Vault share that call.
+            entry = await document_flights.do(("query_documents",) + key, lambda: _fetch_query_page(key, vql_query, cursor))
+
+        headers = {"ETag": entry.etag, "Cache-Control": f"private, max-age={entry.max_age()}", "X-Cache": cache_status}
+        if entry.next_cursor:
+            headers["X-Next-Cursor"] = entry.next_cursor
+        if request.headers.get("If-None-Match") == entry.etag:
+            return Response(status_code=304, headers=headers)
+        response.headers.update(headers)
+        return entry.results
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=502, detail=str(e))
 
+
+@app.post("/query_documents/invalidate")
+async def invalidate_query_cache(vql_query: Optional[str] = None):
+    """Drops the cached result for one VQL query, or the whole query cache when none is given."""
+    key = query_cache_key(vql_query, None) if vql_query else None
+    return {"invalidated": query_cache.invalidate(key)}
+
+def regulatory_status_from_doc(doc_id: str, doc: dict) -> RegulatoryStatus:
+    """Applies the approval rule to a Vault document record."""
+    status_v = doc.get('status__v')
+    is_approved = status_v in ['Approved for Distribution', 'Approved for Production', 'Approved']
+    return RegulatoryStatus(document_id=doc_id, is_approved=is_approved, status_v=status_v, lifecycle__v=doc.get('lifecycle__v'), message="CHECK PASSED" if is_approved else "CHECK FAILED")
+
+
 @app.get("/check_regulatory_status/{doc_id}", response_model=RegulatoryStatus)
 async def check_document_status(doc_id: str):
-    session_id = get_session_id()
-    doc_url = f"https://{VAULT_DNS}/api/{API_VER}/objects/documents/{doc_id}"
-    headers = {"Authorization": session_id, "Accept": "application/json"}
+    return await document_flights.do(("check_regulatory_status", doc_id), lambda: _check_document_status(doc_id))
+
+
+async def _check_document_status(doc_id: str) -> RegulatoryStatus:
+    doc_url = f"{VAULT_SCHEME}://{VAULT_DNS}/api/{API_VER}/objects/documents/{doc_id}"
+    headers = {"Accept": "application/json"}
 
     try:
-        response = requests.get(doc_url, headers=headers, timeout=VAULT_TIMEOUT)
+        response = await vault_request("GET", doc_url, headers=headers)
         response.raise_for_status()
         doc = response.json().get('document', {})
-        status_v = doc.get('status__v')
-        is_approved = status_v in ['Approved for Distribution', 'Approved for Production', 'Approved']
-        return RegulatoryStatus(document_id=doc_id, is_approved=is_approved, status_v=status_v, lifecycle__v=doc.get('lifecycle__v'), message="CHECK PASSED" if is_approved else "CHECK FAILED")
+        return regulatory_status_from_doc(doc_id, doc)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=502, detail=str(e))
 
 
-@app.get("/list_approved_documents", response_model=List[QueryResult])
-async def list_approved_documents(status_filter: str = 'Approved'):
-    session_id = get_session_id()
-    headers = {"Authorization": session_id, "Accept": "application/json"}
-    
-    query_url = f"https://{VAULT_DNS}/api/{API_VER}/query"
-    vql_query = f"SELECT id, name__v, status__v, description__v, format__v FROM documents WHERE status__v = '{status_filter}'"
-    
+async def _query_status_chunk(doc_ids: List[str]) -> dict:
+    """Fetches status fields for up to BATCH_STATUS_CHUNK documents in one VQL query."""
+    vql_query = f"SELECT id, status__v, lifecycle__v FROM documents WHERE id CONTAINS ({', '.join(doc_ids)})"
+    docs = {}
+    async for rows in iter_vql_pages(vql_query):
+        docs.update({str(d['id']): d for d in rows})
+    return docs
+
+
+@app.post("/check_regulatory_status_batch", response_model=List[RegulatoryStatus])
+async def check_document_status_batch(doc_ids: List[str]):
+    """Same check as /check_regulatory_status for many documents, in input order."""
+    valid_ids = list(dict.fromkeys(doc_id for doc_id in doc_ids if doc_id.isdigit()))
+    chunks = [valid_ids[i:i + BATCH_STATUS_CHUNK] for i in range(0, len(valid_ids), BATCH_STATUS_CHUNK)]
+
     try:
-        query_response = requests.post(query_url, data={"q": vql_query}, headers=headers, timeout=VAULT_TIMEOUT)
-        query_response.raise_for_status()
-        docs_data = query_response.json().get('data') or []
-        
-        results = []
-        for d in docs_data:
-            doc_id = str(d['id'])
-            
-            # 1. Handle Friendly Asset Type (Dictionary Logic)
-            val = d.get('format__v')
-            raw_format = str(val).lower() if val is not None else ""
-            asset_type = get_friendly_format(raw_format) # Using your existing helper
+        docs = {}
+        for chunk_docs in await asyncio.gather(*[_query_status_chunk(chunk) for chunk in chunks]):
+            docs.update(chunk_docs)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=str(e))
 
-            # 2. Integrated Multi-Stage Text Extraction
-            extracted_text = "No content available."
-            
-            # --- Stage A: Veeva Native Text ---
-            text_url = f"https://{VAULT_DNS}/api/{API_VER}/objects/documents/{doc_id}/text"
+    results = []
+    for doc_id in doc_ids:
+        if doc_id in docs:
+            results.append(regulatory_status_from_doc(doc_id, docs[doc_id]))
+        else:
+            results.append(RegulatoryStatus(document_id=doc_id, is_approved=False, message="CHECK FAILED: Document not found"))
+    return results
+
+
+async def _extract_preview_text(doc_id: str, headers: dict) -> str:
+    """Returns the first PREVIEW_CHARS characters of a document's text (native text, then PDF rendition)."""
+    extracted_text = "No content available."
+
+    # --- Stage A: Veeva Native Text ---
+    text_url = f"{VAULT_SCHEME}://{VAULT_DNS}/api/{API_VER}/objects/documents/{doc_id}/text"
+    text_resp = await vault_request("GET", text_url, headers=headers)
+    if text_resp.status_code not in (200, 404):
+        # Raising keeps the row out of the preview cache, so it is retried later.
+        raise HTTPException(status_code=502, detail=f"Text request failed with HTTP {text_resp.status_code}")
+    if text_resp.status_code == 200 and text_resp.text.strip():
+        extracted_text = text_resp.text[:PREVIEW_CHARS]
+    else:
+        # --- Stage B: Fallback to PDF Rendition ---
+        spool = await fetch_rendition(doc_id, headers)
+
+        if spool is not None:
+            with spool:
+                # Only the preview is kept, so stop parsing once it is filled.
+                extracted_text = await run_pdf_extraction(spool.source(), max_chars=PREVIEW_CHARS)
+    return extracted_text
+
+
+PREVIEW_TIMEOUT_TEXT = "Content extraction timed out."
+PREVIEW_ERROR_TEXT = "Error during content extraction."
+
+
+async def _build_document_preview(d: dict, headers: dict, semaphore: asyncio.Semaphore) -> QueryResult:
+    """Builds one listing row; a failed or slow document only affects its own row."""
+    doc_id = str(d['id'])
+
+    # 1. Handle Friendly Asset Type (Dictionary Logic)
+    val = d.get('format__v')
+    raw_format = str(val).lower() if val is not None else ""
+    asset_type = get_friendly_format(raw_format) # Using your existing helper
+
+    # 2. Integrated Multi-Stage Text Extraction (bounded by the shared semaphore)
+    version = document_version(d)
+    cached = await get_text_cache().get(doc_id, "preview", version)
+    if cached:
+        extracted_text = cached["text_content"]
+    else:
+        async with semaphore:
             try:
-                text_resp = requests.get(text_url, headers=headers, timeout=VAULT_TIMEOUT)
-                if text_resp.status_code == 200 and text_resp.text.strip():
-                    extracted_text = text_resp.text[:2000]
-                else:
-                    # --- Stage B: Fallback to PDF Rendition ---
-                    rend_url = f"https://{VAULT_DNS}/api/{API_VER}/objects/documents/{doc_id}/renditions/viewable_rendition__v"
-                    rend_resp = requests.get(rend_url, headers=headers, timeout=VAULT_TIMEOUT)
-                    
-                    if rend_resp.status_code == 200:
-                        pdf_stream = io.BytesIO(rend_resp.content)
-                        with fitz.open(stream=pdf_stream, filetype="pdf") as pdf_doc:
-                            extracted_text = "".join([page.get_text() for page in pdf_doc])[:2000]
+                extracted_text = await asyncio.wait_for(
+                    _extract_preview_text(doc_id, headers), timeout=LIST_DOC_TIMEOUT
+                )
+                await get_text_cache().put(doc_id, "preview", version, extracted_text)
+            except asyncio.TimeoutError:
+                extracted_text = PREVIEW_TIMEOUT_TEXT
             except Exception:
-                extracted_text = "Error during content extraction."
+                extracted_text = PREVIEW_ERROR_TEXT
 
-            results.append(QueryResult(
-                document_id=doc_id,
-                name=d.get('name__v', 'N/A'),
-                status_v=d.get('status__v', 'N/A'),
-                asset_type=asset_type, 
-                description=d.get('description__v') or "No description provided.",
-                document_content=extracted_text.strip() or "No text found in file."
-            ))
-            
-        return results
+    return QueryResult(
+        document_id=doc_id,
+        name=d.get('name__v', 'N/A'),
+        status_v=d.get('status__v', 'N/A'),
+        asset_type=asset_type, 
+        description=d.get('description__v') or "No description provided.",
+        document_content=extracted_text.strip() or "No text found in file."
+    )
+
+
+@app.get("/list_approved_documents", response_model=List[QueryResult])
+async def list_approved_documents(response: Response, status_filter: str = 'Approved', cursor: Optional[str] = None, stream: bool = False, live: bool = False):
+    """
+    One page of previews plus X-Next-Cursor when more follow, or with stream=true every page
+    as NDJSON. Streamed rows are sent as soon as their extraction finishes, so they are not in
+    VQL order. Pages come from the pre-warmed snapshot (with X-Snapshot-Generated-At) when one
+    exists for status_filter, in the same shape; live=true bypasses it.
+    """
+    headers = {"Accept": "application/json"}
+
+    snapshot = listing_snapshots.get(status_filter)
+    if cursor and cursor.startswith(SNAPSHOT_CURSOR_PREFIX):
+        offset = cursor[len(SNAPSHOT_CURSOR_PREFIX):]
+        if not (snapshot and snapshot.generated_at and offset.isdigit()):
+            raise HTTPException(status_code=400, detail="Invalid cursor.")
+        return _snapshot_page(snapshot, int(offset), response)
+    if snapshot and snapshot.generated_at and not (live or stream or cursor):
+        return _snapshot_page(snapshot, 0, response)
+    
+    vql_query = _listing_vql(status_filter)
+    semaphore = asyncio.Semaphore(LIST_CONCURRENCY)
+    if cursor:
+        _check_cursor(cursor)
+
+    if stream:
+        async def results():
+            async for rows in iter_vql_pages(vql_query, cursor):
+                for preview in asyncio.as_completed([_build_document_preview(d, headers, semaphore) for d in rows]):
+                    yield await preview
+        return ndjson_stream(results())
+    
+    try:
+        docs_data, next_cursor = await fetch_vql_page(vql_query, cursor)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+
+        # Extract every document concurrently; gather keeps the VQL order.
+        return await asyncio.gather(*[_build_document_preview(d, headers, semaphore) for d in docs_data])
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"Error: {str(e)}")
 
 
+# --- Background Pre-Warmer for Approved Document Listings ---
+def _listing_vql(status_filter: str, modified_after: Optional[str] = None, doc_ids: Optional[List[str]] = None) -> str:
+    vql_query = (
+        "SELECT id, name__v, status__v, description__v, format__v, "
+        "major_version_number__v, minor_version_number__v, version_modified_date__v "
+        f"FROM documents WHERE status__v = '{status_filter}'"
+    )
+    if modified_after:
+        vql_query += f" AND version_modified_date__v > '{modified_after}'"
+    if doc_ids:
+        vql_query += f" AND id CONTAINS ({', '.join(doc_ids)})"
+    return vql_query
+
+
+class ListingSnapshot:
+    """Ready-to-serve previews for one status filter, in VQL order."""
+
+    def __init__(self):
+        self.rows = {}
+        self.generated_at: Optional[datetime] = None
+        # Highest version_modified_date__v seen; the next run only asks for newer documents.
+        self.high_water: Optional[str] = None
+        # Documents whose extraction failed last time and should be retried.
+        self.retry_ids = set()
+        self.runs = 0
+        self.last_run_seconds: Optional[float] = None
+
+    def stats(self) -> dict:
+        return {
+            "documents": len(self.rows),
+            "generated_at": self.generated_at.isoformat() if self.generated_at else None,
+            "high_water": self.high_water,
+            "pending_retries": len(self.retry_ids),
+            "runs": self.runs,
+            "last_run_seconds": self.last_run_seconds,
+        }
+
+
+listing_snapshots = {}
+prewarm_task: Optional[asyncio.Task] = None
+
+
+# Snapshot pages are addressed by offset. A refresh between two requests can shift rows by
+# the documents it added or dropped, as a live listing would.
+SNAPSHOT_CURSOR_PREFIX = "snapshot:"
+
+
+def _snapshot_page(snapshot: ListingSnapshot, offset: int, response: Response) -> List[QueryResult]:
+    rows = list(snapshot.rows.values())
+    end = offset + SNAPSHOT_PAGE_SIZE
+    if end < len(rows):
+        response.headers["X-Next-Cursor"] = f"{SNAPSHOT_CURSOR_PREFIX}{end}"
+    response.headers["X-Snapshot-Generated-At"] = snapshot.generated_at.isoformat()
+    return rows[offset:end]
+
+
+async def refresh_listing_snapshot(status_filter: str) -> ListingSnapshot:
+    """
+    Extracts previews for documents that are new or changed since the last run,
+    then re-reads the ID list to drop documents that left the status and keep VQL order.
+    """
+    started = time.monotonic()
+    snapshot = listing_snapshots.get(status_filter) or ListingSnapshot()
+    headers = {"Accept": "application/json"}
+    semaphore = asyncio.Semaphore(LIST_CONCURRENCY)
+
+    changed = []
+    async for rows in iter_vql_pages(_listing_vql(status_filter, modified_after=snapshot.high_water)):
+        changed.extend(rows)
+
+    ordered_ids = []
+    async for rows in iter_vql_pages(f"SELECT id FROM documents WHERE status__v = '{status_filter}'"):
+        ordered_ids.extend(str(d['id']) for d in rows)
+
+    # Documents that entered the status without a newer modified date, or failed last time.
+    changed_ids = {str(d['id']) for d in changed}
+    missing = [doc_id for doc_id in ordered_ids
+               if (doc_id not in snapshot.rows or doc_id in snapshot.retry_ids) and doc_id not in changed_ids]
+    for i in range(0, len(missing), BATCH_STATUS_CHUNK):
+        async for rows in iter_vql_pages(_listing_vql(status_filter, doc_ids=missing[i:i + BATCH_STATUS_CHUNK])):
+            changed.extend(rows)
+
+    previews = await asyncio.gather(*[_build_document_preview(d, headers, semaphore) for d in changed])
+    rows = {**snapshot.rows, **{preview.document_id: preview for preview in previews}}
+
+    fresh = ListingSnapshot()
+    fresh.rows = {doc_id: rows[doc_id] for doc_id in ordered_ids if doc_id in rows}
+    fresh.retry_ids = {p.document_id for p in previews if p.document_content in (PREVIEW_ERROR_TEXT, PREVIEW_TIMEOUT_TEXT)}
+    fresh.high_water = max(
+        [snapshot.high_water or ""] + [d.get("version_modified_date__v") or "" for d in changed]
+    ) or None
+    fresh.generated_at = datetime.now(timezone.utc)
+    fresh.runs = snapshot.runs + 1
+    fresh.last_run_seconds = round(time.monotonic() - started, 3)
+    # Swap in one assignment so readers never see a half-built snapshot.
+    listing_snapshots[status_filter] = fresh
+    return fresh
+
+
+async def _prewarm_loop():
+    while True:
+        for status_filter in PREWARM_STATUSES:
+            try:
+                await refresh_listing_snapshot(status_filter)
+            except Exception as e:
+                print(f"Pre-warm of '{status_filter}' documents failed: {e}")
+        await asyncio.sleep(PREWARM_INTERVAL)
+
+
+@app.on_event("startup")
+async def start_prewarmer():
+    global prewarm_task
+    if PREWARM_INTERVAL > 0 and all([VAULT_USERNAME, VAULT_PASSWORD, VAULT_DNS, API_VER]):
+        prewarm_task = asyncio.create_task(_prewarm_loop())
+
+
+@app.on_event("shutdown")
+async def stop_prewarmer():
+    if prewarm_task is not None:
+        prewarm_task.cancel()
+
+
+# --- Local Blob Cache for Source Files ---
+def _download_chunk_size(content_length: Optional[int]) -> int:
+    """Larger chunks for larger files: fewer event-loop iterations per megabyte."""
+    if content_length is None:
+        return 256 * 1024
+    if content_length < 1024 * 1024:
+        return 64 * 1024
+    if content_length < 64 * 1024 * 1024:
+        return 256 * 1024
+    return 1024 * 1024
+
+
+def parse_byte_range(range_header: Optional[str], size: int):
+    """
+    Parses a single 'bytes=' range into inclusive (start, end).
+    Returns None when the whole file should be sent (no header, multiple ranges, other units).
+    Raises 416 when the range lies outside the file.
+    """
+    if not range_header or not range_header.startswith("bytes=") or "," in range_header:
+        return None
+    start_text, _, end_text = range_header[len("bytes="):].strip().partition("-")
+    try:
+        if start_text == "":
+            length = int(end_text)
+            if length <= 0:
+                raise ValueError
+            start, end = max(size - length, 0), size - 1
+        else:
+            start = int(start_text)
+            end = min(int(end_text), size - 1) if end_text else size - 1
+    except ValueError:
+        return None
+    if start >= size or start > end:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Requested range not satisfiable.",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, end
+
+
+class BlobCache:
+    """
+    Approved source files kept on disk, validated against Vault with the stored ETag.
+    Files are written to a temp name and only published once fully downloaded.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, doc_id: str):
+        return os.path.join(self.directory, f"{doc_id}.bin"), os.path.join(self.directory, f"{doc_id}.json")
+
+    def lookup(self, doc_id: str) -> Optional[dict]:
+        blob_path, meta_path = self._paths(doc_id)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if os.path.getsize(blob_path) != meta["size"]:
+                return None
+        except (OSError, ValueError, KeyError):
+            return None
+        meta["path"] = blob_path
+        return meta
+
+    def hit(self, meta: dict):
+        """Counts a hit and marks the file as recently used for _evict."""
+        self.hits += 1
+        try:
+            os.utime(meta["path"])
+        except OSError:
+            pass
+
+    def new_temp_file(self):
+        return tempfile.NamedTemporaryFile(dir=self.directory, suffix=".part", delete=False)
+
+    def commit(self, doc_id: str, temp_path: str, meta: dict):
+        blob_path, meta_path = self._paths(doc_id)
+        meta = {**meta, "size": os.path.getsize(temp_path)}
+        os.replace(temp_path, blob_path)
+        with open(meta_path + ".part", "w") as f:
+            json.dump(meta, f)
+        os.replace(meta_path + ".part", meta_path)
+        self.stores += 1
+        self._evict()
+
+    def _evict(self):
+        blobs = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".bin"):
+                path = os.path.join(self.directory, name)
+                stat = os.stat(path)
+                # mtime rather than atime: hit() refreshes it, and relatime/noatime mounts don't update atime.
+                blobs.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in blobs)
+        for _, size, path in sorted(blobs):
+            if total <= self.max_bytes:
+                break
+            for stale in (path, path[:-len(".bin")] + ".json"):
+                try:
+                    os.remove(stale)
+                except OSError:
+                    pass
+            total -= size
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "stores": self.stores}
+
+
+blob_cache: Optional[BlobCache] = None
+
+
+def get_blob_cache() -> Optional[BlobCache]:
+    """The blob cache is optional; it is only enabled when VEEVA_BLOB_CACHE_DIR is set."""
+    global blob_cache
+    if blob_cache is None and BLOB_CACHE_DIR:
+        blob_cache = BlobCache(BLOB_CACHE_DIR, BLOB_CACHE_MAX_BYTES)
+    return blob_cache
+
+
+def _serve_cached_blob(doc_id: str, meta: dict, range_header: Optional[str], if_range: Optional[str]) -> StreamingResponse:
+    size = meta["size"]
+    # If-Range only honours the Range when the client's copy is the one we hold.
+    byte_range = parse_byte_range(range_header, size) if not if_range or if_range == meta.get("etag") else None
+    start, end = byte_range or (0, size - 1)
+    chunk_size = _download_chunk_size(size)
+
+    async def body():
+        with open(meta["path"], "rb") as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = await asyncio.to_thread(f.read, min(chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    headers = {
+        "Content-Disposition": meta.get("content_disposition") or f"attachment; filename=document_{doc_id}",
+        "Accept-Ranges": "bytes",
+        "Content-Length": str(end - start + 1),
+        "ETag": meta["etag"],
+        "X-Cache": "HIT",
+    }
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return StreamingResponse(
+        body(),
+        status_code=206 if byte_range else 200,
+        media_type=meta.get("content_type") or "application/octet-stream",
+        headers=headers
+    )
+
+
 # --- New Endpoint: Download Source File ---
 @app.get("/download_source/{doc_id}")
-async def download_source(doc_id: str):
-    session_id = get_session_id()
-    download_url = f"https://{VAULT_DNS}/api/{API_VER}/objects/documents/{doc_id}/file"
+async def download_source(doc_id: str, request: Request):
+    download_url = f"{VAULT_SCHEME}://{VAULT_DNS}/api/{API_VER}/objects/documents/{doc_id}/file"
     
     # CHANGE: Remove 'application/octet-stream' or set to '*/*'
     headers = {
-        "Authorization": session_id,
         "Accept": "*/*"  # This tells Veeva 'I will accept any response format'
     }
+    range_header = request.headers.get("Range")
+    if_range = request.headers.get("If-Range")
+
+    cache = get_blob_cache() if doc_id.isdigit() else None
+    cached = cache.lookup(doc_id) if cache else None
+    fill_key = ("download_source", doc_id)
+    fill = None
+    if cache and not cached:
+        # Another request is already downloading this file into the cache: wait and serve it from disk.
+        pending = document_flights.join(fill_key)
+        if pending is not None:
+            filled = await asyncio.shield(pending)
+            if filled:
+                cache.hit(filled)
+                return _serve_cached_blob(doc_id, filled, range_header, if_range)
+        elif not range_header:
+            fill = document_flights.lead(fill_key)
+
+    if cached:
+        # Ask Vault whether our copy is still current; ranges are then served from disk.
+        headers["If-None-Match"] = cached["etag"]
+    elif range_header:
+        headers["Range"] = range_header
+        if if_range:
+            headers["If-Range"] = if_range
 
     try:
-        response = requests.get(download_url, headers=headers, stream=True, timeout=VAULT_TIMEOUT)
+        response = await vault_request("GET", download_url, headers=headers, stream=True)
+
+        if cached and response.status_code == 304:
+            await response.aclose()
+            cache.hit(cached)
+            return _serve_cached_blob(doc_id, cached, range_header, if_range)
         
         # If Veeva returns a JSON error instead of a file, catch it here
         if "application/json" in response.headers.get("Content-Type", ""):
+            await response.aclose()
             error_detail = response.json()
             raise HTTPException(status_code=400, detail=error_detail)
 
-        if response.status_code != 200:
+        if response.status_code not in (200, 206):
+            await response.aclose()
             raise HTTPException(status_code=response.status_code, detail="Vault error")
 
         content_disposition = response.headers.get("Content-Disposition", f"attachment; filename=document_{doc_id}")
+        out_headers = {"Content-Disposition": content_disposition}
+        for name in ("Content-Range", "Accept-Ranges", "ETag", "Last-Modified"):
+            if name in response.headers:
+                out_headers[name] = response.headers[name]
+        content_length = response.headers.get("Content-Length")
+        if content_length and "Content-Encoding" not in response.headers:
+            out_headers["Content-Length"] = content_length
+        chunk_size = _download_chunk_size(int(content_length) if content_length else None)
+
+        # Only complete, ETag-validated bodies are worth keeping.
+        etag = response.headers.get("ETag")
+        sink = cache.new_temp_file() if cache and etag and response.status_code == 200 else None
+        if cache:
+            cache.misses += 1
+        if fill is not None and sink is None:
+            document_flights.finish(fill_key, fill)
+
+        async def body():
+            completed = False
+            try:
+                async for chunk in response.aiter_bytes(chunk_size=chunk_size):
+                    if sink:
+                        await asyncio.to_thread(sink.write, chunk)
+                    yield chunk
+                completed = True
+            finally:
+                # The pooled connection is released once the client has received the last chunk.
+                await response.aclose()
+                if sink:
+                    sink.close()
+                    if completed:
+                        await asyncio.to_thread(cache.commit, doc_id, sink.name, {
+                            "etag": etag,
+                            "content_type": response.headers.get("Content-Type"),
+                            "content_disposition": content_disposition,
+                        })
+                    else:
+                        os.remove(sink.name)
+                    if fill is not None:
+                        document_flights.finish(fill_key, fill, cache.lookup(doc_id) if completed else None)
 
         return StreamingResponse(
-            response.iter_content(chunk_size=1024 * 8),
+            body(),
+            status_code=response.status_code,
             media_type=response.headers.get("Content-Type", "application/octet-stream"),
-            headers={"Content-Disposition": content_disposition}
+            headers=out_headers,
+            # Releases waiting requests even if the body was never started.
+            background=BackgroundTask(document_flights.finish, fill_key, fill) if fill is not None else None
         )
 
     except Exception as e:
+        if fill is not None:
+            document_flights.finish(fill_key, fill)
         if isinstance(e, HTTPException):
             raise e
         raise HTTPException(status_code=502, detail=f"Download error: {str(e)}")
@@ -311,58 +1917,138 @@ def get_friendly_format(mime_string: str) -> str:
 
 
 
+async def fetch_document_metadata(doc_id: str) -> dict:
+    """Returns the Vault metadata for one document: 404 when Vault has none, 502 when Vault fails."""
+    return await document_flights.do(("metadata", doc_id), lambda: _fetch_document_metadata(doc_id))
+
+
+async def _fetch_document_metadata(doc_id: str) -> dict:
+    meta_url = f"{VAULT_SCHEME}://{VAULT_DNS}/api/{API_VER}/objects/documents/{doc_id}"
+    meta_resp = await vault_request("GET", meta_url, headers={})
+    if meta_resp.status_code == 404:
+        raise HTTPException(status_code=404, detail="Document metadata not found.")
+    if meta_resp.status_code != 200:
+        # Retryable and other upstream failures are not proof the document is missing.
+        raise HTTPException(status_code=502, detail=f"Metadata request failed with HTTP {meta_resp.status_code}")
+    return meta_resp.json().get("document", {})
+
+
+def _check_page_range(page_start: int, page_count: int):
+    if page_start > page_count:
+        raise HTTPException(status_code=400, detail=f"page_start is beyond the document's {page_count} pages.")
+
+
+async def _stream_document_pages(doc_id: str, spool: RenditionSpool, page_start: int, page_end: Optional[int]):
+    """
+    Extracts the rendition in growing page batches (1, 2, 4... up to TEXT_PAGE_BATCH)
+    so the first page is sent as soon as it is parsed.
+    """
+    try:
+        # The first page is parsed before the response starts, so range errors are still real HTTP errors.
+        page_count, pages = await run_pdf_page_extraction(spool.source(), page_start, page_start)
+        _check_page_range(page_start, page_count)
+        last = page_count if page_end is None else min(page_end, page_count)
+    except BaseException:
+        spool.close()
+        raise
+
+    async def pages_iter():
+        try:
+            for page_no, text in pages:
+                yield DocumentPage(document_id=doc_id, page=page_no, page_count=page_count, text=text)
+            next_page, batch = page_start + 1, 2
+            while next_page <= last:
+                batch_end = min(next_page + batch - 1, last)
+                _, batch_pages = await run_pdf_page_extraction(spool.source(), next_page, batch_end)
+                for page_no, text in batch_pages:
+                    yield DocumentPage(document_id=doc_id, page=page_no, page_count=page_count, text=text)
+                next_page, batch = batch_end + 1, min(batch * 2, TEXT_PAGE_BATCH)
+        finally:
+            spool.close()
+
+    # The generator's finally never runs if the client leaves before the body is iterated.
+    return ndjson_stream(pages_iter(), background=BackgroundTask(spool.close))
+
+
 @app.get("/get_document_text/{doc_id}", response_model=TextContentResponse)
-async def get_document_text(doc_id: str):
-    session_id = get_session_id()
-    auth_header = f"Bearer {session_id}" if not session_id.startswith("Bearer ") else session_id
-    headers = {"Authorization": auth_header}
+async def get_document_text(doc_id: str, page_start: Optional[int] = None, page_end: Optional[int] = None, stream: bool = False):
+    """
+    Full document text, served from the text cache when possible.
+    page_start/page_end (1-based, inclusive) extract only part of the PDF rendition, and
+    stream=true sends one NDJSON line per page as soon as it is parsed. Both skip the
+    native text index, which has no page boundaries, and the full-text cache.
+    """
+    if page_start is not None or page_end is not None or stream:
+        return await _get_document_pages(doc_id, page_start or 1, page_end, stream)
+    return await document_flights.do(("get_document_text", doc_id), lambda: _get_document_text(doc_id))
+
+
+async def _get_document_text(doc_id: str) -> TextContentResponse:
+    cache = get_text_cache()
+
+    # Recently confirmed entries are served without any Vault traffic.
+    cached = await cache.get_fresh(doc_id, "full")
+    if cached:
+        return TextContentResponse(document_id=doc_id, cache_status="HIT", **cached)
+
+    headers = {}
 
     try:
         # --- STEP 1: Fetch Metadata (Name and Asset Type) ---
-        meta_url = f"https://{VAULT_DNS}/api/{API_VER}/objects/documents/{doc_id}"
-        meta_resp = requests.get(meta_url, headers=headers, timeout=VAULT_TIMEOUT)
-        
-        if meta_resp.status_code == 200:
-            doc_data = meta_resp.json().get("document", {})
-            doc_name = doc_data.get("name__v", "Unknown")
-            raw_format = doc_data.get("format__v", "Unknown")
-            
-            # Use the helper to get html, png, jpg, etc.
-            asset_type = get_friendly_format(raw_format)
-        else:
-            raise HTTPException(status_code=404, detail="Document metadata not found.")
+        # Veeva's native text is requested at the same time; it is only dropped if the cache turns out to be current.
+        text_url = f"{VAULT_SCHEME}://{VAULT_DNS}/api/{API_VER}/objects/documents/{doc_id}/text"
+        text_headers = {**headers, "Accept": "text/plain"}
+        text_task = asyncio.create_task(vault_request("GET", text_url, headers=text_headers))
+
+        try:
+            doc_data = await fetch_document_metadata(doc_id)
+        except BaseException:
+            discard_task(text_task)
+            raise
+        doc_name = doc_data.get("name__v", "Unknown")
+        raw_format = doc_data.get("format__v", "Unknown")
+
+        # Use the helper to get html, png, jpg, etc.
+        asset_type = get_friendly_format(raw_format)
+
+        version = document_version(doc_data)
+        cached = await cache.get(doc_id, "full", version)
+        if cached:
+            discard_task(text_task)
+            return TextContentResponse(document_id=doc_id, cache_status="REVALIDATED", **cached)
 
         # --- STEP 2: Try Veeva's Native Text Extraction ---
-        text_url = f"https://{VAULT_DNS}/api/{API_VER}/objects/documents/{doc_id}/text"
-        text_headers = {**headers, "Accept": "text/plain"}
-        
-        text_response = requests.get(text_url, headers=text_headers, timeout=VAULT_TIMEOUT)
+        text_response = await text_task
         
         if text_response.status_code == 200 and text_response.text.strip():
-            return TextContentResponse(
+            result = TextContentResponse(
                 document_id=doc_id,
                 file_name=doc_name,
                 asset_type=asset_type,
                 text_content=text_response.text,
-                status="SUCCESS: Extracted via Veeva Text Index"
+                status="SUCCESS: Extracted via Veeva Text Index",
+                cache_status="MISS"
             )
+            await cache.put(doc_id, "full", version, result.text_content, doc_name, asset_type, result.status)
+            return result
 
         # --- STEP 3: Fallback to PDF Rendition (Works for PPT, Word, etc.) ---
-        rendition_url = f"https://{VAULT_DNS}/api/{API_VER}/objects/documents/{doc_id}/renditions/viewable_rendition__v"
-        rend_resp = requests.get(rendition_url, headers=headers, stream=True, timeout=VAULT_TIMEOUT)
+        spool = await fetch_rendition(doc_id, headers)
 
-        if rend_resp.status_code == 200:
-            pdf_stream = io.BytesIO(rend_resp.content)
-            with fitz.open(stream=pdf_stream, filetype="pdf") as doc:
-                extracted_text = "".join([page.get_text() for page in doc])
+        if spool is not None:
+            with spool:
+                extracted_text = await run_pdf_extraction(spool.source())
             
-            return TextContentResponse(
+            result = TextContentResponse(
                 document_id=doc_id,
                 file_name=doc_name,
                 asset_type=asset_type,
                 text_content=extracted_text.strip() or "No text found in PDF.",
-                status="SUCCESS: Extracted from Viewable Rendition (PDF)"
+                status="SUCCESS: Extracted from Viewable Rendition (PDF)",
+                cache_status="MISS"
             )
+            await cache.put(doc_id, "full", version, result.text_content, doc_name, asset_type, result.status)
+            return result
 
         # Final return if no text is found anywhere
         return TextContentResponse(
@@ -370,8 +2056,116 @@ async def get_document_text(doc_id: str):
             file_name=doc_name,
             asset_type=asset_type,
             text_content="",
-            status="FAILED: No text available"
+            status="FAILED: No text available",
+            cache_status="MISS"
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Error: {str(e)}")
+
+
+async def _get_document_pages(doc_id: str, page_start: int, page_end: Optional[int], stream: bool):
+    if page_start < 1 or (page_end is not None and page_end < page_start):
+        raise HTTPException(status_code=400, detail="page_start must be >= 1 and page_end >= page_start.")
+    headers = {}
+
+    try:
+        doc_data = await fetch_document_metadata(doc_id)
+        doc_name = doc_data.get("name__v", "Unknown")
+        asset_type = get_friendly_format(doc_data.get("format__v", "Unknown"))
+
+        spool = await fetch_rendition(doc_id, headers)
+        if spool is None:
+            if stream:
+                raise HTTPException(status_code=404, detail="Document has no viewable rendition.")
+            return TextContentResponse(
+                document_id=doc_id,
+                file_name=doc_name,
+                asset_type=asset_type,
+                text_content="",
+                status="FAILED: No viewable rendition available",
+                page_start=page_start,
+                page_end=page_end,
+            )
+
+        if stream:
+            return await _stream_document_pages(doc_id, spool, page_start, page_end)
+
+        with spool:
+            page_count, pages = await run_pdf_page_extraction(spool.source(), page_start, page_end)
+        _check_page_range(page_start, page_count)
+
+        return TextContentResponse(
+            document_id=doc_id,
+            file_name=doc_name,
+            asset_type=asset_type,
+            text_content="".join(text for _, text in pages).strip() or "No text found in PDF.",
+            status=f"SUCCESS: Extracted pages {pages[0][0]}-{pages[-1][0]} from Viewable Rendition (PDF)",
+            page_start=pages[0][0],
+            page_end=pages[-1][0],
+            page_count=page_count,
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=502, detail=f"Error: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=502, detail=f"Error: {str(e)}")
+
+
+# --- Document Bundle ---
+@app.get("/document_bundle/{doc_id}", response_model=DocumentBundle)
+async def get_document_bundle(doc_id: str):
+    """
+    Metadata, regulatory status, text and approval audit for one document in one call.
+    The parts run concurrently, so the bundle takes about as long as the slowest part.
+    A failing part is reported under errors instead of failing the whole bundle.
+    """
+    started = time.monotonic()
+    timings = {}
+    failures = {}
+
+    async def timed(name: str, coro):
+        part_started = time.monotonic()
+        try:
+            return await coro
+        except Exception as e:
+            failures[name] = e
+            return None
+        finally:
+            timings[name] = round((time.monotonic() - part_started) * 1000, 1)
+
+    async def status_part():
+        # Shares the metadata call with the metadata part through the request coalescer.
+        return regulatory_status_from_doc(doc_id, await fetch_document_metadata(doc_id))
+
+    try:
+        # Authenticate once up front instead of having every part wait on the session refresh.
+        await get_session_id()
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=str(e))
+
+    doc_data, regulatory_status, text, approval_audit = await asyncio.gather(
+        timed("metadata", fetch_document_metadata(doc_id)),
+        timed("regulatory_status", status_part()),
+        timed("text", get_document_text(doc_id)),
+        timed("approval_audit", verify_approval_audit(doc_id)),
+    )
+    metadata_error = failures.get("metadata")
+    if isinstance(metadata_error, HTTPException) and metadata_error.status_code == 404:
+        raise metadata_error
+    timings["total"] = round((time.monotonic() - started) * 1000, 1)
+
+    return DocumentBundle(
+        document_id=doc_id,
+        file_name=doc_data.get("name__v") if doc_data else None,
+        asset_type=get_friendly_format(doc_data.get("format__v", "Unknown")) if doc_data else None,
+        regulatory_status=regulatory_status,
+        text=text,
+        approval_audit=approval_audit,
+        timings_ms=timings,
+        errors={name: e.detail if isinstance(e, HTTPException) else str(e) for name, e in failures.items()},
+    )
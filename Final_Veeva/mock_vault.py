@@ -0,0 +1,232 @@
+"""
+Local stand-in for the Veeva Vault REST API used by main.py.
+
+Serves synthetic documents, PDF renditions, source files and audit trail records
+so the Veeva service can be load-tested without a real Vault.
+
+Run it, then point the service at it:
+    uvicorn Final_Veeva.mock_vault:app --port 9000
+    VEEVA_VAULT_SCHEME=http VEEVA_VAULT_DNS=127.0.0.1:9000 VEEVA_API_VERSION=v24.1 \
+    VEEVA_USERNAME=mock VEEVA_PASSWORD=mock uvicorn Final_Veeva.main:app --port 8000
+
+Behaviour is controlled with environment variables:
+    MOCK_VAULT_DOCS          number of synthetic documents (default 200)
+    MOCK_VAULT_PDF_PAGES     pages per rendition (default 20)
+    MOCK_VAULT_FILE_BYTES    size of each source file (default 5 MB)
+    MOCK_VAULT_PAGE_SIZE     VQL / audit trail page size (default 100)
+    MOCK_VAULT_LATENCY_MS    base latency added to every call (default 50)
+    MOCK_VAULT_JITTER_MS     random extra latency, uniform 0..N (default 50)
+    MOCK_VAULT_ERROR_RATE    fraction of calls answered with HTTP 500 (default 0)
+"""
+import os
+import re
+import random
+import asyncio
+import hashlib
+import functools
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import fitz  # PyMuPDF
+from fastapi import FastAPI, Request, Form, HTTPException
+from fastapi.responses import JSONResponse, Response, PlainTextResponse
+
+MOCK_DOCS = int(os.getenv("MOCK_VAULT_DOCS", "200"))
+MOCK_PDF_PAGES = int(os.getenv("MOCK_VAULT_PDF_PAGES", "20"))
+MOCK_FILE_BYTES = int(os.getenv("MOCK_VAULT_FILE_BYTES", str(5 * 1024 * 1024)))
+MOCK_PAGE_SIZE = int(os.getenv("MOCK_VAULT_PAGE_SIZE", "100"))
+MOCK_LATENCY_MS = float(os.getenv("MOCK_VAULT_LATENCY_MS", "50"))
+MOCK_JITTER_MS = float(os.getenv("MOCK_VAULT_JITTER_MS", "50"))
+MOCK_ERROR_RATE = float(os.getenv("MOCK_VAULT_ERROR_RATE", "0"))
+
+SESSION_ID = "mock-session-0001"
+STATUSES = ["Approved", "Approved for Distribution", "Draft", "In Review"]
+FORMATS = ["application/pdf", "application/vnd.openxmlformats-officedocument.presentationml.presentation", "text/html"]
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+app = FastAPI(title="Mock Veeva Vault")
+
+
+def _document(doc_id: int) -> dict:
+    return {
+        "id": doc_id,
+        "name__v": f"Synthetic Document {doc_id}",
+        "status__v": STATUSES[doc_id % len(STATUSES)],
+        "lifecycle__v": "general_lifecycle__c",
+        "description__v": f"Synthetic description for document {doc_id}",
+        "format__v": FORMATS[doc_id % len(FORMATS)],
+        "major_version_number__v": 1,
+        "minor_version_number__v": doc_id % 3,
+        "version_modified_date__v": (EPOCH + timedelta(days=doc_id % 365)).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+    }
+
+
+DOCUMENTS = {doc_id: _document(doc_id) for doc_id in range(1, MOCK_DOCS + 1)}
+
+
+def _audit_records() -> list:
+    records = []
+    for doc_id, doc in DOCUMENTS.items():
+        created = EPOCH + timedelta(hours=doc_id)
+        records.append({
+            "id": f"{doc_id}-1", "doc_id": str(doc_id), "item_id": str(doc_id),
+            "event_type__v": "Workflow", "action": "Start", "event_description": "Review started",
+            "user_name__v": "author@mock", "timestamp": created.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        })
+        if doc["status__v"].startswith("Approved"):
+            records.append({
+                "id": f"{doc_id}-2", "doc_id": str(doc_id), "item_id": str(doc_id),
+                "event_type__v": "Workflow", "action": "Approve", "event_description": "Approved",
+                "user_name__v": "approver@mock", "role__v": "Approver",
+                "timestamp": (created + timedelta(days=2)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            })
+    return sorted(records, key=lambda r: r["timestamp"])
+
+
+AUDIT_RECORDS = _audit_records()
+
+
+@functools.lru_cache(maxsize=None)
+def _rendition(doc_id: int) -> bytes:
+    pdf = fitz.open()
+    for page_no in range(MOCK_PDF_PAGES):
+        page = pdf.new_page()
+        page.insert_text((72, 72), f"Document {doc_id} - page {page_no + 1}")
+        page.insert_textbox(fitz.Rect(72, 100, 540, 780), ("Synthetic regulatory copy. " * 60), fontsize=9)
+    data = pdf.tobytes()
+    pdf.close()
+    return data
+
+
+@functools.lru_cache(maxsize=32)
+def _source_file(doc_id: int) -> bytes:
+    seed = hashlib.sha256(str(doc_id).encode()).digest()
+    return (seed * (MOCK_FILE_BYTES // len(seed) + 1))[:MOCK_FILE_BYTES]
+
+
+@app.middleware("http")
+async def inject_latency_and_errors(request: Request, call_next):
+    delay = MOCK_LATENCY_MS + random.uniform(0, MOCK_JITTER_MS)
+    await asyncio.sleep(delay / 1000)
+    if random.random() < MOCK_ERROR_RATE:
+        return JSONResponse(status_code=500, content={"responseStatus": "FAILURE", "errors": [{"type": "INTERNAL"}]})
+    if not request.url.path.endswith("/auth") and request.headers.get("Authorization", "").removeprefix("Bearer ") != SESSION_ID:
+        return JSONResponse({"responseStatus": "FAILURE", "errors": [{"type": "INVALID_SESSION_ID"}]})
+    return await call_next(request)
+
+
+def _get_document(doc_id: int) -> dict:
+    if doc_id not in DOCUMENTS:
+        raise HTTPException(status_code=404, detail="Document not found")
+    return DOCUMENTS[doc_id]
+
+
+def _page(rows: list, offset: int, next_path: str) -> dict:
+    page = rows[offset:offset + MOCK_PAGE_SIZE]
+    details = {"pagesize": MOCK_PAGE_SIZE, "pageoffset": offset, "size": len(page), "total": len(rows)}
+    if offset + MOCK_PAGE_SIZE < len(rows):
+        separator = "&" if "?" in next_path else "?"
+        details["next_page"] = f"{next_path}{separator}pageoffset={offset + MOCK_PAGE_SIZE}"
+    return {"responseStatus": "SUCCESS", "responseDetails": details, "data": page}
+
+
+def _run_vql(vql: str) -> list:
+    """Understands just the filters the service sends: id CONTAINS (...), status__v = '...', modified date."""
+    rows = list(DOCUMENTS.values())
+    ids = re.search(r"id\s+CONTAINS\s*\(([^)]*)\)", vql, re.IGNORECASE)
+    if ids:
+        wanted = {int(x) for x in re.findall(r"\d+", ids.group(1))}
+        rows = [d for d in rows if d["id"] in wanted]
+    status_match = re.search(r"status__v\s*=\s*'([^']*)'", vql)
+    if status_match:
+        rows = [d for d in rows if d["status__v"] == status_match.group(1)]
+    modified = re.search(r"version_modified_date__v\s*>\s*'([^']*)'", vql)
+    if modified:
+        rows = [d for d in rows if d["version_modified_date__v"] > modified.group(1)]
+    return rows
+
+
+QUERY_RESULTS = {}
+
+
+@app.post("/api/{version}/auth")
+async def auth(username: str = Form(...), password: str = Form(...)):
+    return {"responseStatus": "SUCCESS", "sessionId": SESSION_ID}
+
+
+@app.post("/api/{version}/query")
+async def query(version: str, q: str = Form(...)):
+    rows = _run_vql(q)
+    token = hashlib.sha1(q.encode()).hexdigest()[:12]
+    QUERY_RESULTS[token] = rows
+    return _page(rows, 0, f"/api/{version}/query/{token}")
+
+
+@app.get("/api/{version}/query/{token}")
+async def query_page(version: str, token: str, pageoffset: int = 0):
+    if token not in QUERY_RESULTS:
+        return {"responseStatus": "FAILURE", "errors": [{"type": "INVALID_DATA"}]}
+    return _page(QUERY_RESULTS[token], pageoffset, f"/api/{version}/query/{token}")
+
+
+@app.get("/api/{version}/objects/documents/{doc_id}")
+async def document(doc_id: int):
+    return {"responseStatus": "SUCCESS", "document": _get_document(doc_id)}
+
+
+@app.get("/api/{version}/objects/documents/{doc_id}/text")
+async def document_text(doc_id: int):
+    _get_document(doc_id)
+    # Every other document has no text index, which forces the rendition fallback.
+    if doc_id % 2 == 0:
+        return PlainTextResponse("", status_code=404)
+    return PlainTextResponse(f"Native text for document {doc_id}. " + "Indexed body text. " * 200)
+
+
+@app.get("/api/{version}/objects/documents/{doc_id}/renditions/viewable_rendition__v")
+async def rendition(doc_id: int):
+    _get_document(doc_id)
+    return Response(_rendition(doc_id), media_type="application/pdf")
+
+
+@app.get("/api/{version}/objects/documents/{doc_id}/file")
+async def source_file(request: Request, doc_id: int):
+    _get_document(doc_id)
+    data = _source_file(doc_id)
+    etag = f'"{hashlib.md5(data).hexdigest()}"'
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f"attachment; filename=document_{doc_id}.bin",
+    }
+    if request.headers.get("If-None-Match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    range_match = re.fullmatch(r"bytes=(\d*)-(\d*)", request.headers.get("Range", ""))
+    if range_match and request.headers.get("If-Range", etag) == etag:
+        start_text, end_text = range_match.groups()
+        if start_text:
+            start, end = int(start_text), min(int(end_text or len(data) - 1), len(data) - 1)
+        else:
+            start, end = max(len(data) - int(end_text), 0), len(data) - 1
+        headers["Content-Range"] = f"bytes {start}-{end}/{len(data)}"
+        return Response(data[start:end + 1], status_code=206, media_type="application/octet-stream", headers=headers)
+    return Response(data, media_type="application/octet-stream", headers=headers)
+
+
+@app.get("/api/{version}/audittrail/document_audit_trail")
+async def audit_trail(
+    version: str,
+    all_dates: bool = False,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    pageoffset: int = 0,
+):
+    records = AUDIT_RECORDS
+    if not all_dates:
+        if start_date:
+            records = [r for r in records if r["timestamp"] >= start_date]
+        if end_date:
+            records = [r for r in records if r["timestamp"] <= end_date]
+    query = "all_dates=true" if all_dates else f"start_date={start_date or ''}&end_date={end_date or ''}"
+    return _page(records, pageoffset, f"/api/{version}/audittrail/document_audit_trail?{query}")
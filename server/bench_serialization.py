@@ -0,0 +1,127 @@
+"""
+Microbenchmark for list route serialization.
+
+Compares FastAPI's default path (jsonable_encoder + json.dumps, what a route returning
+[dict(row) for row in rows] goes through) with main.RowsResponse, on synthetic rows shaped
+like content_assets and translation_memory. Values use asyncpg's own UUID type, as the
+database returns them, and each run checks that both paths decode to the same JSON.
+
+Run from the repository root:
+    python -m server.bench_serialization --rows 100 1000 10000 --repeat 5
+"""
+import json
+import time
+import uuid
+import random
+import argparse
+from decimal import Decimal
+from datetime import datetime, date, timedelta, timezone
+from typing import Callable, List
+
+from fastapi.encoders import jsonable_encoder
+
+from server.main import RowsResponse
+
+try:
+    from asyncpg.pgproto.pgproto import UUID as RecordUUID
+except ImportError:
+    RecordUUID = uuid.UUID
+
+EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _uuid() -> uuid.UUID:
+    return RecordUUID(uuid.uuid4().hex)
+
+
+def content_asset_row(i: int) -> dict:
+    return {
+        "id": _uuid(),
+        "project_id": _uuid(),
+        "brand_id": _uuid(),
+        "asset_name": f"Asset {i}",
+        "asset_type": random.choice(["email", "banner", "detail_aid"]),
+        "content_category": "promotional",
+        "status": "draft",
+        "primary_content": "Lorem ipsum dolor sit amet. " * 40,
+        "metadata": json.dumps({"channel": "email", "tags": ["hcp", "launch"], "version": i % 7}),
+        "target_audience": "HCP",
+        "channel_specifications": json.dumps({"width": 600, "format": "html"}),
+        "ai_analysis": json.dumps({"readability": 61.5, "claims": [f"claim {n}" for n in range(5)]}),
+        "performance_prediction": json.dumps({"ctr": 0.031, "confidence": 0.8}),
+        "intake_context": json.dumps({"source": "brief", "notes": "Initial intake " * 10}),
+        "created_by": _uuid(),
+        "updated_by": _uuid(),
+        "created_at": EPOCH + timedelta(minutes=i),
+        "updated_at": EPOCH + timedelta(minutes=i, seconds=30),
+    }
+
+
+def translation_memory_row(i: int) -> dict:
+    return {
+        "id": _uuid(),
+        "brand_id": _uuid(),
+        "asset_id": _uuid(),
+        "project_id": _uuid(),
+        "source_text": f"Take one tablet daily with food, segment {i}.",
+        "target_text": f"Prenez un comprimé par jour avec de la nourriture, segment {i}.",
+        "source_language": "en",
+        "target_language": "fr",
+        "domain_context": "dosing",
+        "quality_score": Decimal("92.50"),
+        "confidence_level": Decimal("0.875"),
+        "usage_count": i % 40,
+        "last_used": date(2025, 1, 1) + timedelta(days=i % 365),
+        "created_by": _uuid(),
+        "created_at": EPOCH + timedelta(seconds=i),
+        "updated_at": EPOCH + timedelta(seconds=i, microseconds=1500),
+    }
+
+
+SHAPES = {
+    "content_assets": content_asset_row,
+    "translation_memory": translation_memory_row,
+}
+
+
+def default_path(rows: List[dict]) -> bytes:
+    # JSONResponse.render after jsonable_encoder, as FastAPI does for a returned list
+    return json.dumps(
+        jsonable_encoder(rows), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def rows_response_path(rows: List[dict]) -> bytes:
+    return RowsResponse(rows).body
+
+
+def best_of(fn: Callable[[List[dict]], bytes], rows: List[dict], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(rows)
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shapes", nargs="+", choices=sorted(SHAPES), default=list(SHAPES))
+    parser.add_argument("--rows", nargs="+", type=int, default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement; the fastest is reported")
+    args = parser.parse_args()
+
+    print(f"{'shape':<20}{'rows':>8}{'default_ms':>13}{'rows_response_ms':>19}{'speedup':>10}{'bytes':>12}")
+    for shape in args.shapes:
+        for count in args.rows:
+            rows = [SHAPES[shape](i) for i in range(count)]
+            expected, actual = default_path(rows), rows_response_path(rows)
+            if json.loads(expected) != json.loads(actual):
+                raise SystemExit(f"{shape}: RowsResponse output differs from jsonable_encoder")
+            default_ms = best_of(default_path, rows, args.repeat)
+            fast_ms = best_of(rows_response_path, rows, args.repeat)
+            print(f"{shape:<20}{count:>8}{default_ms:>13.2f}{fast_ms:>19.2f}{default_ms / fast_ms:>9.1f}x{len(actual):>12}")
+
+
+if __name__ == "__main__":
+    main()
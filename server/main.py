@@ -1,11 +1,22 @@
 import os
 import re
 import ssl
+import sys
+import json
+import base64
+import functools
+import time
+import heapq
+import asyncio
+from collections import deque
 from uuid import UUID # Added for UUID support
 from datetime import datetime, date
-from typing import Optional, List, Dict, Any
-from fastapi import FastAPI, HTTPException
+from decimal import Decimal
+from typing import Optional, List, Dict, Any, Tuple
+from fastapi import FastAPI, HTTPException, Request, Response, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel, EmailStr
 import asyncpg
 from dotenv import load_dotenv
@@ -23,6 +34,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Shared Database Connection Pool
@@ -45,13 +57,335 @@ async def startup():
         print("Successfully connected to AWS RDS via SSL.")
     except Exception as e:
         print(f"Database connection error: {e}")
+        return
+
+    # Concurrent index builds can take minutes on large tables; don't hold up startup for them.
+    app.state.background_tasks = [asyncio.create_task(ensure_indexes())]
+
+    # In-memory indexes: built once now, then optionally rebuilt from the database on an interval.
+    for name, index, interval in (
+        ("Glossary matcher", glossary_matcher, GLOSSARY_RELOAD_SECONDS),
+        ("TM match index", tm_index, TM_INDEX_RELOAD_SECONDS),
+    ):
+        try:
+            await index.reload()
+            print(f"{name} built: {index.stats()}")
+        except Exception as e:
+            print(f"{name} not built: {e}")
+        if interval > 0:
+            app.state.background_tasks.append(asyncio.create_task(_reload_loop(name, index, interval)))
 
 @app.on_event("shutdown")
 async def shutdown():
+    tasks = getattr(app.state, "background_tasks", [])
+    for task in tasks:
+        task.cancel()
+    # Let them release their connections (an index build may be mid-statement) before closing the pool.
+    await asyncio.gather(*tasks, return_exceptions=True)
     if pool:
         await pool.close()
         print("Database connection pool closed.")
 
+# Indexes the lookups below rely on. Each statement is idempotent and applied in the background
+# after startup; a failure (e.g. no permission to create the pg_trgm extension) is logged and skipped.
+# Indexes are built CONCURRENTLY so a build on a populated table does not block writes.
+INDEX_DDL = [
+    # match-fragments: batched, case-insensitive glossary lookup
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS glossary_terms_term_en_lower_idx ON glossary_terms (lower(term_en))",
+    # match-fragments: ILIKE '%word%' over translation memory
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS translation_memory_source_text_trgm_idx ON translation_memory USING gin (source_text gin_trgm_ops)",
+    # List routes: keyset pagination order (sort column, id) plus the usual filters in front of it.
+    # translation_memory_brand_lang_created_idx also serves match-fragments' brand/language filter.
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS translation_memory_brand_lang_created_idx ON translation_memory (brand_id, target_language, created_at DESC, id DESC)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS translation_memory_created_idx ON translation_memory (created_at DESC, id DESC)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS translation_memory_project_created_idx ON translation_memory (project_id, created_at DESC, id DESC)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS content_assets_created_idx ON content_assets (created_at DESC, id DESC)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS content_assets_brand_created_idx ON content_assets (brand_id, created_at DESC, id DESC)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS content_assets_project_created_idx ON content_assets (project_id, created_at DESC, id DESC)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS cross_module_context_brand_created_idx ON cross_module_context (brand_id, created_at DESC, id DESC)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS content_performance_attribution_created_idx ON content_performance_attribution (created_at DESC, id DESC)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS content_performance_attribution_brand_created_idx ON content_performance_attribution (brand_id, created_at DESC, id DESC)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS localization_projects_brand_created_idx ON localization_projects (brand_id, created_at DESC, id DESC)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS content_sessions_activity_idx ON content_sessions (last_activity DESC, id DESC)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS content_sessions_user_activity_idx ON content_sessions (user_id, last_activity DESC, id DESC)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS glocal_tm_intelligence_created_idx ON glocal_tm_intelligence (created_at DESC, id DESC)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS glocal_tm_intelligence_project_created_idx ON glocal_tm_intelligence (project_id, created_at DESC, id DESC)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS glocal_regulatory_compliance_project_created_idx ON glocal_regulatory_compliance (project_id, created_at DESC, id DESC)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS glocal_analytics_date_idx ON glocal_analytics (measurement_date DESC, id DESC)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS glocal_analytics_project_date_idx ON glocal_analytics (project_id, measurement_date DESC, id DESC)",
+]
+
+# Session-level advisory lock so only one instance builds indexes at a time.
+INDEX_LOCK_KEY = 7305412
+
+INVALID_INDEX_SQL = """
+    SELECT NOT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+    WHERE c.relname = $1
+"""
+
+async def ensure_indexes():
+    """
+    Applies INDEX_DDL outside a transaction, as CREATE INDEX CONCURRENTLY requires. A failed
+    concurrent build leaves an INVALID index that IF NOT EXISTS would skip forever, so one is
+    dropped and rebuilt. Instances started together skip the work while another holds the lock.
+    """
+    try:
+        async with pool.acquire() as conn:
+            if not await conn.fetchval("SELECT pg_try_advisory_lock($1)", INDEX_LOCK_KEY):
+                print("Index setup skipped: another instance is applying it.")
+                return
+            try:
+                for ddl in INDEX_DDL:
+                    try:
+                        name = re.search(r"IF NOT EXISTS (\w+) ON", ddl)
+                        if name and await conn.fetchval(INVALID_INDEX_SQL, name.group(1)):
+                            await conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name.group(1)}")
+                        await conn.execute(ddl)
+                    except Exception as e:
+                        print(f"Index setup skipped ({ddl.split(' ON ')[0]}): {e}")
+            finally:
+                await conn.execute("SELECT pg_advisory_unlock($1)", INDEX_LOCK_KEY)
+        print("Index setup finished.")
+    except Exception as e:
+        print(f"Index setup failed: {e}")
+
+# --- JSON encoding of database rows ---
+# orjson writes UUID, datetime and date itself; everything it does not know goes through
+# _json_default. Without orjson installed the standard json module is used instead.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _json_default(value):
+    # asyncpg returns its own UUID subclass, which orjson does not accept as a UUID
+    if isinstance(value, UUID):
+        return str(value)
+    # Same rule as FastAPI's jsonable_encoder: whole numbers stay integers
+    if isinstance(value, Decimal):
+        return int(value) if value.as_tuple().exponent >= 0 else float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps_json(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_json_default)
+    return json.dumps(content, default=_json_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+class RowsResponse(Response):
+    """JSON response for lists of row dicts that skips jsonable_encoder."""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps_json(content)
+
+# --- List queries: filters and keyset pagination ---
+LIST_MAX_LIMIT = int(os.getenv("LIST_MAX_LIMIT", "1000"))
+# Rows per round trip when a list route streams (?stream=true).
+LIST_STREAM_PREFETCH = int(os.getenv("LIST_STREAM_PREFETCH", "500"))
+
+_CURSOR_TYPES = {
+    "datetime": (datetime, datetime.isoformat, datetime.fromisoformat),
+    "date": (date, date.isoformat, date.fromisoformat),
+    "uuid": (UUID, str, UUID),
+    "int": (int, int, int),
+    "str": (str, str, str),
+}
+
+def _cursor_part(value) -> List[Any]:
+    if value is None:
+        return ["null", None]
+    # datetime before date: every datetime is also a date
+    for tag, (kind, dump, _) in _CURSOR_TYPES.items():
+        if isinstance(value, kind):
+            return [tag, dump(value)]
+    raise TypeError(f"Cannot paginate on {type(value).__name__}")
+
+def encode_cursor(row, order_column: str) -> str:
+    """Opaque cursor holding the last row's sort value and id."""
+    parts = [_cursor_part(row[order_column]), _cursor_part(row['id'])]
+    return base64.urlsafe_b64encode(json.dumps(parts).encode()).decode()
+
+def decode_cursor(cursor: str) -> List[Any]:
+    try:
+        parts = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return [None if tag == "null" else _CURSOR_TYPES[tag][2](value) for tag, value in parts]
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@functools.lru_cache(maxsize=None)
+def list_columns(table: str) -> frozenset:
+    """
+    Columns a list route may return with ?fields=: the table's schema fields plus the columns
+    the database fills in. Resolved on first use because the schemas are defined further down.
+    """
+    schema, generated = {
+        "projects": (ProjectSchema, {"id"}),
+        "content_assets": (ContentAssetSchema, {"id", "created_at", "updated_at"}),
+        "cross_module_context": (CrossModuleContextSchema, {"id", "created_at", "updated_at"}),
+        "content_performance_attribution": (ContentPerformanceSchema, {"id", "created_at"}),
+        "localization_projects": (LocalizationProjectSchema, {"id", "created_at", "updated_at"}),
+        "brand_market_configurations": (BrandMarketConfigSchema, {"id", "updated_at"}),
+        "brand_profiles": (BrandProfileSchema, {"id", "updated_at"}),
+        "content_sessions": (ContentSessionSchema, {"id"}),
+        "translation_memory": (TranslationMemorySchema, {"id", "created_at", "updated_at"}),
+        "glocal_tm_intelligence": (GlocalTMIntelligenceSchema, {"id", "created_at"}),
+        "glocal_regulatory_compliance": (GlocalRegulatoryComplianceSchema, {"id", "created_at", "updated_at"}),
+        "glocal_analytics": (GlocalAnalyticsSchema, {"id"}),
+        "profiles": (ProfileSchema, {"id", "created_at", "updated_at"}),
+        "segmented_content": (SegmentedContentSchema, {"id"}),
+        "translated_content": (TranslatedContentSchema, {"id"}),
+    }[table]
+    return frozenset(schema.model_fields) | frozenset(generated)
+
+def select_columns(table: str, fields: Optional[str], required: List[str]) -> str:
+    """Validates ?fields= against the table's whitelist and returns the SELECT list."""
+    if not fields:
+        return "*"
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    allowed = list_columns(table)
+    unknown = [field for field in requested if field not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields {unknown}; allowed: {sorted(allowed)}"
+        )
+    return ", ".join(dict.fromkeys(required + requested))
+
+def build_list_query(
+    table: str,
+    order_column: str,
+    descending: bool,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    filters: Optional[Dict[str, Any]] = None,
+    date_from=None,
+    date_to=None,
+    fields: Optional[str] = None,
+) -> Tuple[str, List[Any]]:
+    """
+    SELECT for a collection route. filters maps column -> value (None = not filtered);
+    date_from/date_to bound the sort column. Rows are ordered by (sort column, id), which is
+    what the cursor continues from. fields is a comma-separated column list to return instead
+    of every column; id and the sort column are always included.
+    """
+    columns = select_columns(table, fields, [order_column, "id"])
+    conditions, args = [], []
+    for column, value in (filters or {}).items():
+        if value is not None:
+            args.append(value)
+            conditions.append(f"{column} = ${len(args)}")
+    if date_from is not None:
+        args.append(date_from)
+        conditions.append(f"{order_column} >= ${len(args)}")
+    if date_to is not None:
+        args.append(date_to)
+        conditions.append(f"{order_column} <= ${len(args)}")
+    # Postgres' default NULL placement, spelled out: the (sort column, id) indexes follow it.
+    # Rows with a NULL sort value come first in DESC order and last in ASC order.
+    direction = "DESC" if descending else "ASC"
+    nulls = "NULLS FIRST" if descending else "NULLS LAST"
+    if cursor:
+        last_value, last_id = decode_cursor(cursor)
+        comparison = "<" if descending else ">"
+        if order_column == "id":
+            args.append(last_id)
+            conditions.append(f"id {comparison} ${len(args)}")
+        elif last_value is None:
+            # Still among the NULLs: the rest of them by id, then (DESC only) every non-NULL row.
+            args.append(last_id)
+            rest = "IS NOT NULL OR" if descending else "IS NULL AND"
+            conditions.append(f"({order_column} {rest} id {comparison} ${len(args)})")
+        else:
+            # A row compared with NULL is never true, so ASC adds the NULLs still to come.
+            args.extend([last_value, last_id])
+            keyset = f"({order_column}, id) {comparison} (${len(args) - 1}, ${len(args)})"
+            conditions.append(keyset if descending else f"({keyset} OR {order_column} IS NULL)")
+
+    query = f"SELECT {columns} FROM {table}"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    if order_column == "id":
+        query += f" ORDER BY id {direction}"
+    else:
+        query += f" ORDER BY {order_column} {direction} {nulls}, id {direction}"
+    if limit is not None:
+        args.append(limit)
+        query += f" LIMIT ${len(args)}"
+    return query, args
+
+async def fetch_list(
+    table: str,
+    order_column: str,
+    descending: bool,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    filters: Optional[Dict[str, Any]] = None,
+    date_from=None,
+    date_to=None,
+    fields: Optional[str] = None,
+    stream: bool = False,
+):
+    """
+    Runs build_list_query. Without a limit every matching row is returned; with one, the
+    cursor for the next page is sent in the X-Next-Cursor header. The rows are encoded by
+    RowsResponse. stream=True returns them as NDJSON read through a server-side cursor
+    instead (no X-Next-Cursor).
+    """
+    try:
+        if stream:
+            query, args = build_list_query(table, order_column, descending, limit, cursor,
+                                           filters, date_from, date_to, fields)
+            rows = stream_rows(query, args)
+            # The first chunk is read here, so a query that fails gets a status code rather than
+            # a broken stream. aclose releases the connection if the body is never iterated.
+            try:
+                first = await rows.__anext__()
+            except StopAsyncIteration:
+                first = b""
+
+            async def body():
+                yield first
+                async for chunk in rows:
+                    yield chunk
+
+            return StreamingResponse(body(), media_type="application/x-ndjson", background=BackgroundTask(rows.aclose))
+
+        # One extra row tells us whether there is a next page.
+        query, args = build_list_query(table, order_column, descending,
+                                       None if limit is None else limit + 1, cursor,
+                                       filters, date_from, date_to, fields)
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(query, *args)
+    except asyncpg.DataError:
+        # A well-formed cursor whose values don't fit this table's columns, e.g. one from another route
+        if cursor:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        raise
+    headers = {}
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(rows[-1], order_column)
+    return RowsResponse([dict(row) for row in rows], headers=headers)
+
+async def stream_rows(query: str, args: List[Any]):
+    """
+    Yields one JSON line per row. asyncpg cursors only exist inside a transaction; rows are
+    fetched LIST_STREAM_PREFETCH at a time, so memory stays flat however large the table is.
+    """
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            lines = []
+            async for row in conn.cursor(query, *args, prefetch=LIST_STREAM_PREFETCH):
+                lines.append(dumps_json(dict(row)))
+                if len(lines) >= LIST_STREAM_PREFETCH:
+                    yield b"\n".join(lines) + b"\n"
+                    lines = []
+            if lines:
+                yield b"\n".join(lines) + b"\n"
+
 # --- Pydantic Model (UPDATED to UUID) ---
 class ProjectSchema(BaseModel):
     name: str
@@ -179,10 +513,13 @@ class TranslatedContentSchema(BaseModel):
 # --- SIMPLE PROJECTS ROUTES (Integer ID) ---
 
 @app.get("/api/projects")
-async def get_projects():
-    async with pool.acquire() as conn:
-        rows = await conn.fetch("SELECT * FROM projects ORDER BY id ASC")
-        return [dict(row) for row in rows]
+async def get_projects(
+    limit: Optional[int] = Query(None, ge=1, le=LIST_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    stream: bool = False,
+):
+    return await fetch_list("projects", "id", False, limit, cursor, fields=fields, stream=stream)
 
 @app.post("/api/projects", status_code=201)
 async def create_project(project: ProjectSchema):
@@ -220,10 +557,20 @@ async def health():
         return {"status": "ok", "db_time": now}
 
 @app.get("/api/content-assets")
-async def read_assets():
-    async with pool.acquire() as conn:
-        rows = await conn.fetch("SELECT * FROM content_assets ORDER BY created_at DESC")
-        return [dict(row) for row in rows]
+async def read_assets(
+    limit: Optional[int] = Query(None, ge=1, le=LIST_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    stream: bool = False,
+    brand_id: Optional[UUID] = None,
+    project_id: Optional[UUID] = None,
+    status: Optional[str] = None,
+    asset_type: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+):
+    return await fetch_list("content_assets", "created_at", True, limit, cursor,
+                            {"brand_id": brand_id, "project_id": project_id, "status": status, "asset_type": asset_type}, date_from, date_to, fields=fields, stream=stream)
 
 @app.post("/api/content-assets", status_code=201)
 async def create_asset(asset: ContentAssetSchema):
@@ -278,10 +625,20 @@ async def delete_asset(asset_id: UUID): # asset_id is now UUID
         return None
 
 @app.get("/api/cross-module-context")
-async def get_all_contexts():
-    async with pool.acquire() as conn:
-        rows = await conn.fetch("SELECT * FROM cross_module_context ORDER BY created_at DESC")
-        return [dict(row) for row in rows]
+async def get_all_contexts(
+    limit: Optional[int] = Query(None, ge=1, le=LIST_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    stream: bool = False,
+    brand_id: Optional[UUID] = None,
+    user_id: Optional[UUID] = None,
+    context_type: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+):
+    return await fetch_list("cross_module_context", "created_at", True, limit, cursor,
+                            {"brand_id": brand_id, "user_id": user_id, "context_type": context_type, "is_active": is_active}, date_from, date_to, fields=fields, stream=stream)
 
 @app.post("/api/cross-module-context", status_code=201)
 async def create_context(ctx: CrossModuleContextSchema):
@@ -329,10 +686,18 @@ async def delete_context(ctx_id: UUID):
 # --- CRUD ROUTES for Performance Attribution ---
 
 @app.get("/api/content-performance-attribution")
-async def get_performance_data():
-    async with pool.acquire() as conn:
-        rows = await conn.fetch("SELECT * FROM content_performance_attribution ORDER BY created_at DESC")
-        return [dict(row) for row in rows]
+async def get_performance_data(
+    limit: Optional[int] = Query(None, ge=1, le=LIST_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    stream: bool = False,
+    brand_id: Optional[UUID] = None,
+    channel: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+):
+    return await fetch_list("content_performance_attribution", "created_at", True, limit, cursor,
+                            {"brand_id": brand_id, "channel": channel}, date_from, date_to, fields=fields, stream=stream)
 
 @app.post("/api/content-performance-attribution", status_code=201)
 async def create_performance_record(record: ContentPerformanceSchema):
@@ -399,10 +764,18 @@ async def delete_performance_record(record_id: UUID):
 # --- LOCALIZATION PROJECTS ROUTES ---
 
 @app.get("/api/localization-projects")
-async def get_localization_projects():
-    async with pool.acquire() as conn:
-        rows = await conn.fetch("SELECT * FROM localization_projects ORDER BY created_at DESC")
-        return [dict(row) for row in rows]
+async def get_localization_projects(
+    limit: Optional[int] = Query(None, ge=1, le=LIST_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    stream: bool = False,
+    brand_id: Optional[UUID] = None,
+    status: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+):
+    return await fetch_list("localization_projects", "created_at", True, limit, cursor,
+                            {"brand_id": brand_id, "status": status}, date_from, date_to, fields=fields, stream=stream)
 
 @app.post("/api/localization-projects", status_code=201)
 async def create_localization_project(proj: LocalizationProjectSchema):
@@ -469,10 +842,17 @@ async def delete_localization_project(project_id: UUID):
 # --- BRAND MARKET CONFIGURATION ROUTES ---
 
 @app.get("/api/brand-market-configs")
-async def get_market_configs():
-    async with pool.acquire() as conn:
-        rows = await conn.fetch("SELECT * FROM brand_market_configurations ORDER BY market_name ASC")
-        return [dict(row) for row in rows]
+async def get_market_configs(
+    limit: Optional[int] = Query(None, ge=1, le=LIST_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    stream: bool = False,
+    brand_id: Optional[UUID] = None,
+    language_code: Optional[str] = None,
+    is_active: Optional[bool] = None,
+):
+    return await fetch_list("brand_market_configurations", "market_name", False, limit, cursor,
+                            {"brand_id": brand_id, "language_code": language_code, "is_active": is_active}, fields=fields, stream=stream)
 
 @app.post("/api/brand-market-configs", status_code=201)
 async def create_market_config(config: BrandMarketConfigSchema):
@@ -526,10 +906,13 @@ async def delete_market_config(config_id: UUID):
 # --- BRAND PROFILES ROUTES ---
 
 @app.get("/api/brand-profiles")
-async def get_brands():
-    async with pool.acquire() as conn:
-        rows = await conn.fetch("SELECT * FROM brand_profiles ORDER BY brand_name ASC")
-        return [dict(row) for row in rows]
+async def get_brands(
+    limit: Optional[int] = Query(None, ge=1, le=LIST_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    stream: bool = False,
+):
+    return await fetch_list("brand_profiles", "brand_name", False, limit, cursor, fields=fields, stream=stream)
 
 @app.post("/api/brand-profiles", status_code=201)
 async def create_brand(brand: BrandProfileSchema):
@@ -578,10 +961,20 @@ async def delete_brand(brand_id: UUID):
 # --- CONTENT SESSIONS ROUTES ---
 
 @app.get("/api/content-sessions")
-async def get_sessions():
-    async with pool.acquire() as conn:
-        rows = await conn.fetch("SELECT * FROM content_sessions ORDER BY last_activity DESC")
-        return [dict(row) for row in rows]
+async def get_sessions(
+    limit: Optional[int] = Query(None, ge=1, le=LIST_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    stream: bool = False,
+    user_id: Optional[UUID] = None,
+    project_id: Optional[UUID] = None,
+    asset_id: Optional[UUID] = None,
+    is_active: Optional[bool] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+):
+    return await fetch_list("content_sessions", "last_activity", True, limit, cursor,
+                            {"user_id": user_id, "project_id": project_id, "asset_id": asset_id, "is_active": is_active}, date_from, date_to, fields=fields, stream=stream)
 
 @app.post("/api/content-sessions", status_code=201)
 async def create_session(session: ContentSessionSchema):
@@ -648,13 +1041,224 @@ class TranslationMemorySchema(BaseModel):
     project_id: Optional[UUID] = None
     market: Optional[str] = None
 
+# --- In-memory TM match engine ---
+# Fuzzy matches below this score (0-100) are not returned unless the caller asks for a lower one.
+TM_FUZZY_MIN_SCORE = int(os.getenv("TM_FUZZY_MIN_SCORE", "75"))
+# Candidates re-scored with edit distance per lookup, after the word-overlap prefilter.
+TM_FUZZY_CANDIDATES = int(os.getenv("TM_FUZZY_CANDIDATES", "100"))
+# Rebuild the index from the table on this interval (0 = only at startup); set it when several instances write TM.
+TM_INDEX_RELOAD_SECONDS = int(os.getenv("TM_INDEX_RELOAD_SECONDS", "0"))
+
+# (lowest score, band) in descending order; the usual CAT leverage bands
+LEVERAGE_BANDS = [(100, "exact"), (95, "95-99"), (85, "85-94"), (75, "75-84"), (50, "50-74"), (0, "new")]
+
+def leverage_band(score: int) -> str:
+    return next(band for floor, band in LEVERAGE_BANDS if score >= floor)
+
+def tm_tokens(text: str) -> List[str]:
+    """Lowercased words and punctuation marks; punctuation counts toward edit distance but is not indexed."""
+    return re.findall(r"\w+|[^\w\s]", text.lower())
+
+def word_edit_distance(a, b) -> int:
+    previous = list(range(len(b) + 1))
+    for i, token_a in enumerate(a, 1):
+        current = [i]
+        for j, token_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (token_a != token_b)))
+        previous = current
+    return previous[-1]
+
+class TMUnit:
+    __slots__ = ("id", "source_text", "target_text", "quality_score", "confidence_level", "tokens", "words")
+
+    def __init__(self, row):
+        self.id = row['id']
+        self.source_text = row['source_text']
+        self.target_text = row['target_text']
+        self.quality_score = row['quality_score']
+        self.confidence_level = row['confidence_level']
+        self.tokens = tuple(tm_tokens(self.source_text or ""))
+        self.words = tuple(token for token in self.tokens if token[0].isalnum() or token[0] == "_")
+
+class TMPartition:
+    """
+    TM units for one brand and language pair, with an inverted word index for candidate lookup.
+    Units are addressed by small integer slots, which are cheaper to hash and store than UUIDs.
+    """
+
+    def __init__(self):
+        self.units: Dict[int, TMUnit] = {}
+        self.exact: Dict[Tuple[str, ...], set] = {}
+        self.postings: Dict[str, set] = {}
+
+    def add(self, slot: int, unit: TMUnit):
+        self.units[slot] = unit
+        self.exact.setdefault(unit.tokens, set()).add(slot)
+        for word in set(unit.words):
+            self.postings.setdefault(word, set()).add(slot)
+
+    def remove(self, slot: int):
+        unit = self.units.pop(slot, None)
+        if unit is None:
+            return
+        for key, index in [(unit.tokens, self.exact)] + [(word, self.postings) for word in set(unit.words)]:
+            slots = index.get(key)
+            if slots is not None:
+                slots.discard(slot)
+                if not slots:
+                    del index[key]
+
+    def candidates(self, words: set, min_score: int) -> List[int]:
+        """
+        Units sharing enough words with the query to possibly reach min_score, most overlap first.
+        Postings are walked rarest first; once there are candidates, words present in over a
+        tenth of the partition are treated as stop words and assumed to match.
+        """
+        threshold = max(min_score, 1) / 100
+        # Dice(q, c) >= t implies |q & c| >= t * |q| / (2 - t)
+        needed = threshold * len(words) / (2 - threshold)
+        common_cutoff = max(len(self.units) // 10, 1000)
+        overlap: Dict[int, int] = {}
+        skipped = 0
+        for slots in sorted((self.postings[word] for word in words if word in self.postings), key=len):
+            if len(slots) > common_cutoff and overlap:
+                skipped += 1
+                continue
+            for slot in slots:
+                overlap[slot] = overlap.get(slot, 0) + 1
+        needed -= skipped
+        return heapq.nlargest(
+            TM_FUZZY_CANDIDATES,
+            (slot for slot, count in overlap.items() if count >= needed),
+            key=overlap.__getitem__,
+        )
+
+class TMIndex:
+    """
+    Exact and fuzzy matching over translation_memory, partitioned by (brand_id, source_language,
+    target_language). Kept current by the TM create/update/delete routes.
+    """
+
+    def __init__(self):
+        self.partitions: Dict[Tuple[str, str, str], TMPartition] = {}
+        self.locations: Dict[Any, Tuple[Tuple[str, str, str], int]] = {}  # TM id -> (partition key, slot)
+        self.build_ms: Optional[float] = None
+        self.built_at: Optional[datetime] = None
+        self._next_slot = 0
+        self._pending: Optional[list] = None  # changes made while a rebuild is running
+
+    @staticmethod
+    def partition_key(brand_id, source_language: str, target_language: str) -> Tuple[str, str, str]:
+        return (str(brand_id), (source_language or "").lower(), (target_language or "").lower())
+
+    async def reload(self):
+        self._pending = []
+        try:
+            started = time.perf_counter()
+            async with pool.acquire() as conn:
+                rows = await conn.fetch(
+                    """
+                    SELECT id, brand_id, source_language, target_language, source_text, target_text,
+                           quality_score, confidence_level
+                    FROM translation_memory
+                    """
+                )
+            fresh = TMIndex()
+            await asyncio.to_thread(lambda: [fresh._upsert(row) for row in rows])
+            for change, arg in self._pending:
+                getattr(fresh, change)(arg)
+            self.partitions, self.locations, self._next_slot = fresh.partitions, fresh.locations, fresh._next_slot
+            self.build_ms = round((time.perf_counter() - started) * 1000, 1)
+            self.built_at = datetime.now()
+        finally:
+            self._pending = None
+
+    def upsert(self, row):
+        """Adds or replaces the unit for a translation_memory row (asyncpg Record or dict)."""
+        if self._pending is not None:
+            self._pending.append(("_upsert", row))
+        self._upsert(row)
+
+    def remove(self, tm_id):
+        if self._pending is not None:
+            self._pending.append(("_remove", tm_id))
+        self._remove(tm_id)
+
+    def _upsert(self, row):
+        self._remove(row['id'])
+        key = self.partition_key(row['brand_id'], row['source_language'], row['target_language'])
+        slot = self._next_slot
+        self._next_slot += 1
+        self.partitions.setdefault(key, TMPartition()).add(slot, TMUnit(row))
+        self.locations[row['id']] = (key, slot)
+
+    def _remove(self, tm_id):
+        location = self.locations.pop(tm_id, None)
+        if location is not None:
+            key, slot = location
+            self.partitions[key].remove(slot)
+
+    def match(self, text: str, brand_id, source_language: str, target_language: str, min_score: int, limit: int) -> List[Dict[str, Any]]:
+        partition = self.partitions.get(self.partition_key(brand_id, source_language, target_language))
+        if partition is None:
+            return []
+        query = TMUnit({"id": None, "source_text": text, "target_text": None, "quality_score": None, "confidence_level": None})
+        scored = {slot: 100 for slot in partition.exact.get(query.tokens, ())}
+        if len(scored) < limit:
+            for slot in partition.candidates(set(query.words), min_score):
+                if slot in scored:
+                    continue
+                words = partition.units[slot].words
+                distance = word_edit_distance(query.words, words)
+                # Scored on words only; 100 is reserved for exact matches, so a punctuation-only difference is 99.
+                score = min(int(100 * (1 - distance / max(len(query.words), len(words), 1))), 99)
+                if score >= min_score:
+                    scored[slot] = score
+
+        ranked = sorted(scored.items(), key=lambda item: (item[1], partition.units[item[0]].quality_score or 0), reverse=True)
+        results = []
+        for slot, score in ranked[:limit]:
+            unit = partition.units[slot]
+            results.append({
+                "id": unit.id,
+                "source_text": unit.source_text,
+                "target_text": unit.target_text,
+                "score": score,
+                "match_type": "exact" if score == 100 else "fuzzy",
+                "leverage_band": leverage_band(score),
+                "quality_score": unit.quality_score,
+                "confidence_level": unit.confidence_level,
+            })
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "units": len(self.locations),
+            "partitions": len(self.partitions),
+            "indexed_words": sum(len(p.postings) for p in self.partitions.values()),
+            "build_ms": self.build_ms,
+            "built_at": self.built_at,
+        }
+
+tm_index = TMIndex()
+
 # --- TRANSLATION MEMORY ROUTES ---
 
 @app.get("/api/translation-memory")
-async def get_tm_entries():
-    async with pool.acquire() as conn:
-        rows = await conn.fetch("SELECT * FROM translation_memory ORDER BY created_at DESC")
-        return [dict(row) for row in rows]
+async def get_tm_entries(
+    limit: Optional[int] = Query(None, ge=1, le=LIST_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    stream: bool = False,
+    brand_id: Optional[UUID] = None,
+    project_id: Optional[UUID] = None,
+    source_language: Optional[str] = None,
+    target_language: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+):
+    return await fetch_list("translation_memory", "created_at", True, limit, cursor,
+                            {"brand_id": brand_id, "project_id": project_id, "source_language": source_language, "target_language": target_language}, date_from, date_to, fields=fields, stream=stream)
 
 @app.post("/api/translation-memory", status_code=201)
 async def create_tm_entry(entry: TranslationMemorySchema):
@@ -675,6 +1279,7 @@ async def create_tm_entry(entry: TranslationMemorySchema):
             entry.last_used, entry.cultural_adaptations, entry.regulatory_notes,
             entry.created_by, entry.asset_id, entry.project_id, entry.market
         )
+        tm_index.upsert(row)
         return dict(row)
 
 @app.put("/api/translation-memory/{tm_id}")
@@ -698,6 +1303,7 @@ async def update_tm_entry(tm_id: UUID, entry: TranslationMemorySchema):
         )
         if not row:
             raise HTTPException(status_code=404, detail="Entry not found")
+        tm_index.upsert(row)
         return dict(row)
 
 @app.delete("/api/translation-memory/{tm_id}", status_code=204)
@@ -714,8 +1320,46 @@ async def delete_tm_entry(tm_id: UUID):
                 status_code=404, 
                 detail="Translation memory entry not found"
             )
+        tm_index.remove(tm_id)
         # status_code 204 means "No Content" - the standard for successful deletes
         return None
+
+@app.get("/api/translation-memory/matches")
+async def match_translation_memory(
+    text: str,
+    brand_id: UUID,
+    source_lang: str,
+    target_lang: str,
+    min_score: int = TM_FUZZY_MIN_SCORE,
+    limit: int = 5,
+):
+    """
+    Exact and fuzzy TM matches for one segment, best first, scored 0-100 by word-level edit
+    distance (100 = exact). Served from the in-memory index, without a database round trip.
+    """
+    if not 0 <= min_score <= 100 or limit < 1:
+        raise HTTPException(status_code=400, detail="min_score must be 0-100 and limit at least 1")
+    started = time.perf_counter()
+    matches = tm_index.match(text, brand_id, source_lang, target_lang, min_score, limit)
+
+    best = matches[0]["score"] if matches else 0
+    word_count = len(re.findall(r"\w+", text))
+    return {
+        "matches": matches,
+        "leverage": {
+            "best_score": best,
+            "leverage_band": leverage_band(best),
+            "exact_match_words": word_count if best == 100 else 0,
+            "fuzzy_match_words": word_count if 75 <= best < 100 else 0,
+            "new_words": word_count if best < 75 else 0,
+            "leverage_percentage": float(best),
+        },
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+@app.get("/api/translation-memory/index-stats")
+async def tm_index_stats():
+    return tm_index.stats()
     
 # ------------------- Cultural Intelligence Page -------------------
 
@@ -779,11 +1423,21 @@ class ProfileSchema(BaseModel):
     is_demo_user: bool = False
 
 @app.get("/api/glocal-tm-intelligence")
-async def get_all_tm_intelligence():
-    async with pool.acquire() as conn:
-        # We order by created_at DESC so the newest analysis appears first
-        rows = await conn.fetch("SELECT * FROM glocal_tm_intelligence ORDER BY created_at DESC")
-        return [dict(row) for row in rows]
+async def get_all_tm_intelligence(
+    limit: Optional[int] = Query(None, ge=1, le=LIST_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    stream: bool = False,
+    project_id: Optional[UUID] = None,
+    segment_id: Optional[UUID] = None,
+    source_language: Optional[str] = None,
+    target_language: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+):
+    # We order by created_at DESC so the newest analysis appears first
+    return await fetch_list("glocal_tm_intelligence", "created_at", True, limit, cursor,
+                            {"project_id": project_id, "segment_id": segment_id, "source_language": source_language, "target_language": target_language}, date_from, date_to, fields=fields, stream=stream)
 
 @app.post("/api/glocal-tm-intelligence", status_code=201)
 async def create_tm_intelligence(data: GlocalTMIntelligenceSchema):
@@ -861,10 +1515,20 @@ async def delete_tm_intelligence(intelligence_id: UUID):
         return None
     
 @app.get("/api/glocal-regulatory-compliance")
-async def get_all_compliance_records():
-    async with pool.acquire() as conn:
-        rows = await conn.fetch("SELECT * FROM glocal_regulatory_compliance ORDER BY created_at DESC")
-        return [dict(row) for row in rows]
+async def get_all_compliance_records(
+    limit: Optional[int] = Query(None, ge=1, le=LIST_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    stream: bool = False,
+    project_id: Optional[UUID] = None,
+    segment_id: Optional[UUID] = None,
+    target_market: Optional[str] = None,
+    risk_level: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+):
+    return await fetch_list("glocal_regulatory_compliance", "created_at", True, limit, cursor,
+                            {"project_id": project_id, "segment_id": segment_id, "target_market": target_market, "risk_level": risk_level}, date_from, date_to, fields=fields, stream=stream)
     
 @app.post("/api/glocal-regulatory-compliance", status_code=201)
 async def create_compliance_record(data: GlocalRegulatoryComplianceSchema):
@@ -918,10 +1582,18 @@ async def delete_compliance_record(compliance_id: UUID):
         return None
     
 @app.get("/api/glocal-analytics")
-async def get_analytics():
-    async with pool.acquire() as conn:
-        rows = await conn.fetch("SELECT * FROM glocal_analytics ORDER BY measurement_date DESC")
-        return [dict(row) for row in rows]
+async def get_analytics(
+    limit: Optional[int] = Query(None, ge=1, le=LIST_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    stream: bool = False,
+    project_id: Optional[UUID] = None,
+    metric_type: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+):
+    return await fetch_list("glocal_analytics", "measurement_date", True, limit, cursor,
+                            {"project_id": project_id, "metric_type": metric_type}, date_from, date_to, fields=fields, stream=stream)
     
 @app.post("/api/glocal-analytics", status_code=201)
 async def create_analytics_entry(data: GlocalAnalyticsSchema):
@@ -974,10 +1646,16 @@ async def delete_analytics_entry(analytics_id: UUID):
         return None
     
 @app.get("/api/profiles")
-async def get_profiles():
-    async with pool.acquire() as conn:
-        rows = await conn.fetch("SELECT * FROM profiles ORDER BY created_at DESC")
-        return [dict(row) for row in rows]
+async def get_profiles(
+    limit: Optional[int] = Query(None, ge=1, le=LIST_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    stream: bool = False,
+    user_id: Optional[UUID] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+):
+    return await fetch_list("profiles", "created_at", True, limit, cursor, {"user_id": user_id}, date_from, date_to, fields=fields, stream=stream)
     
 @app.post("/api/profiles", status_code=201)
 async def create_profile(profile: ProfileSchema):
@@ -1020,10 +1698,14 @@ async def delete_profile(profile_id: UUID):
 
 """---------- Segmented Content Page ---------------------"""
 @app.get("/api/segmented-content")
-async def get_all_segmented_content():
-    async with pool.acquire() as conn:
-        rows = await conn.fetch("SELECT * FROM segmented_content ORDER BY id ASC")
-        return [dict(row) for row in rows]
+async def get_all_segmented_content(
+    limit: Optional[int] = Query(None, ge=1, le=LIST_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    stream: bool = False,
+    document_name: Optional[str] = None,
+):
+    return await fetch_list("segmented_content", "id", False, limit, cursor, {"document_name": document_name}, fields=fields, stream=stream)
 @app.put("/api/segmented-content/by-no/{segmented_no}")
 async def update_segmented_content_by_no(segmented_no: str, content: SegmentedContentSchema):
     async with pool.acquire() as conn:
@@ -1075,10 +1757,16 @@ async def delete_segmented_content_by_no(segmented_no: str):
         return None
 
 @app.get("/api/translated-content")
-async def get_all_translations():
-    async with pool.acquire() as conn:
-        rows = await conn.fetch("SELECT * FROM translated_content ORDER BY id ASC")
-        return [dict(row) for row in rows]
+async def get_all_translations(
+    limit: Optional[int] = Query(None, ge=1, le=LIST_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    stream: bool = False,
+    source_language: Optional[str] = None,
+    target_language: Optional[str] = None,
+):
+    return await fetch_list("translated_content", "id", False, limit, cursor,
+                            {"source_language": source_language, "target_language": target_language}, fields=fields, stream=stream)
    
 @app.post("/api/translated-content", status_code=201)
 async def create_translation(item: TranslatedContentSchema):
@@ -1117,49 +1805,176 @@ async def delete_translation(id: int):
             raise HTTPException(status_code=404, detail="Translation ID not found")
         return None
 
-# @app.get("/api/translation-memory/match-fragments")
-# async def match_fragments(text: str, target_lang: str, brand_id: str): # Use str or UUID
-#     async with pool.acquire() as conn:
-#         # Clean and split into words of 4+ characters to avoid 'the', 'is', 'at'
-#         words = list(set(re.findall(r'\b\w{4,}\b', text.lower())))
-#         glossary_hints = {}
-
-#         for word in words:
-#             # Query refined to find the word even near punctuation
-#             query = """
-#                 SELECT target_text 
-#                 FROM translation_memory 
-#                 WHERE source_text ILIKE $1 
-#                 AND target_language = $2 
-#                 AND brand_id = $3
-#                 LIMIT 1
-#             """
-#             # We use %word% to find it anywhere in the sentence
-#             match = await conn.fetchrow(query, f"%{word}%", target_lang, brand_id)
-            
-#             if match:
-#                 # We return the whole target sentence as context for the AI
-#                 glossary_hints[word] = match['target_text']
-
-#         return {"matches": glossary_hints}
-
-# @app.post("/api/translation-memory", status_code=201)
-# async def create_tm_entry(entry: TranslationMemorySchema):
-#     async with pool.acquire() as conn:
-#         row = await conn.fetchrow(
-#             """
-#             INSERT INTO translation_memory (
-#                 brand_id, source_text, target_text, source_language, target_language,
-#                 domain_context, match_type, quality_score, confidence_level,
-#                 usage_count, last_used, project_id, market
-#             ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, NOW(), $11, $12) 
-#             RETURNING id
-#             """,
-#             entry.brand_id, entry.source_text, entry.target_text, entry.source_language,
-#             entry.target_language, entry.domain_context, entry.match_type,
-#             entry.quality_score, entry.confidence_level, entry.usage_count,
-#             entry.project_id, entry.market
-#         )
+# # --- In-memory glossary matcher (Aho-Corasick) ---
+# The glossary is reloaded from the database this often, to pick up writes made by other instances.
+GLOSSARY_RELOAD_SECONDS = int(os.getenv("GLOSSARY_RELOAD_SECONDS", "300"))
+
+def normalize_term(text: str) -> str:
+    """Lowercases and collapses whitespace, so 'Adverse  Event' and 'adverse event' are the same term."""
+    return " ".join(text.lower().split())
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+class GlossaryAutomaton:
+    """
+    Aho-Corasick automaton over normalized glossary terms. find() scans the text once and
+    returns the leftmost-longest, non-overlapping whole-word matches.
+    """
+
+    def __init__(self, terms):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.out: List[Optional[str]] = [None]  # term ending exactly at this state
+        self.out_link: List[int] = [0]          # nearest state on the fail chain that ends a term
+        for term in terms:
+            self._insert(term)
+        self._link()
+
+    def _insert(self, term: str):
+        state = 0
+        for ch in term:
+            nxt = self.goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[state][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append(None)
+                self.out_link.append(0)
+            state = nxt
+        self.out[state] = term
+
+    def _link(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[nxt] = self.goto[fallback].get(ch, 0)
+                target = self.fail[nxt]
+                self.out_link[nxt] = target if self.out[target] is not None else self.out_link[target]
+
+    def find(self, text: str) -> List[str]:
+        text = normalize_term(text)
+        candidates = []
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(ch, 0)
+            hit = state if self.out[state] is not None else self.out_link[state]
+            while hit:
+                term = self.out[hit]
+                start = i - len(term) + 1
+                # Only whole words: 'go' must not match inside 'going'.
+                before_ok = start == 0 or not (_is_word_char(term[0]) and _is_word_char(text[start - 1]))
+                after_ok = i + 1 == len(text) or not (_is_word_char(term[-1]) and _is_word_char(text[i + 1]))
+                if before_ok and after_ok:
+                    candidates.append((start, i + 1, term))
+                hit = self.out_link[hit]
+
+        matches = []
+        covered_to = 0
+        for start, end, term in sorted(candidates, key=lambda c: (c[0], -c[1])):
+            if start >= covered_to:
+                matches.append(term)
+                covered_to = end
+        return matches
+
+    def memory_bytes(self) -> int:
+        """Approximate size of the automaton's Python structures."""
+        size = sum(sys.getsizeof(edges) for edges in self.goto)
+        size += sum(sys.getsizeof(table) for table in (self.goto, self.fail, self.out, self.out_link))
+        size += sum(sys.getsizeof(term) for term in self.out if term is not None)
+        return size
+
+class GlossaryMatcher:
+    """
+    Glossary terms held in memory with their automaton. Builds run in a worker thread and
+    the new automaton is swapped in when complete, so lookups never see a half-built one.
+    glossary_terms has no language or brand columns, so there is a single partition.
+    """
+
+    def __init__(self):
+        self.terms: Dict[str, str] = {}
+        self.automaton: Optional[GlossaryAutomaton] = None
+        self.build_ms: Optional[float] = None
+        self.built_at: Optional[datetime] = None
+        self._lock = asyncio.Lock()
+        self._pending: Optional[list] = None  # pairs added while a reload is running
+
+    @property
+    def loaded(self) -> bool:
+        return self.automaton is not None
+
+    async def reload(self):
+        """Rebuilds from the full glossary_terms table."""
+        self._pending = []
+        try:
+            async with pool.acquire() as conn:
+                rows = await conn.fetch("SELECT term_en, term_target FROM glossary_terms")
+            terms = {}
+            for row in rows:
+                terms.setdefault(normalize_term(row['term_en']), row['term_target'])
+            async with self._lock:
+                # Terms synced after the snapshot was read would otherwise go to the old automaton only
+                for term_en, term_target in self._pending:
+                    terms.setdefault(normalize_term(term_en), term_target)
+                await self._build(terms)
+        finally:
+            self._pending = None
+
+    async def add_terms(self, pairs):
+        """Adds newly written (term_en, term_target) pairs; existing terms keep their translation."""
+        pairs = list(pairs)
+        if self._pending is not None:
+            self._pending.extend(pairs)
+        if not self.loaded:
+            return
+        async with self._lock:
+            terms = dict(self.terms)
+            for term_en, term_target in pairs:
+                terms.setdefault(normalize_term(term_en), term_target)
+            if len(terms) != len(self.terms):
+                await self._build(terms)
+
+    async def _build(self, terms: Dict[str, str]):
+        started = time.perf_counter()
+        automaton = await asyncio.to_thread(GlossaryAutomaton, [term for term in terms if term])
+        self.terms, self.automaton = terms, automaton
+        self.build_ms = round((time.perf_counter() - started) * 1000, 1)
+        self.built_at = datetime.now()
+
+    def match(self, text: str) -> Dict[str, str]:
+        return {term: self.terms[term] for term in self.automaton.find(text)}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loaded": self.loaded,
+            "terms": len(self.terms),
+            "states": len(self.automaton.goto) if self.automaton else 0,
+            "build_ms": self.build_ms,
+            "memory_bytes": self.automaton.memory_bytes() if self.automaton else 0,
+            "built_at": self.built_at,
+        }
+
+glossary_matcher = GlossaryMatcher()
+
+async def _reload_loop(name: str, index, interval: int):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await index.reload()
+        except Exception as e:
+            print(f"{name} reload failed: {e}")
+
+@app.get("/api/glossary/matcher-stats")
+async def glossary_matcher_stats():
+    return glossary_matcher.stats()
 
 
 @app.get("/api/translation-memory/match-fragments")
@@ -1167,34 +1982,47 @@ async def match_fragments(text: str, target_lang: str, brand_id: str):
     if pool is None:
         raise HTTPException(status_code=500, detail="Database pool not initialized")
 
+    # Tokenize: Finds words with 3+ characters (e.g., 'back', 'go')
+    words = list(set(re.findall(r'\b\w{3,}\b', text.lower())))
+    glossary_hints = {}
+
     async with pool.acquire() as conn:
-        # Tokenize: Finds words with 3+ characters (e.g., 'back', 'go')
-        words = list(set(re.findall(r'\b\w{3,}\b', text.lower())))
-        glossary_hints = {}
-
-        for word in words:
-            # STEP A: Check the high-precision Glossary (Word-to-Word)
-            # This is where your "Go -> Po" mapping lives
-            glossary_match = await conn.fetchrow(
-                "SELECT term_target FROM glossary_terms WHERE term_en ILIKE $1", 
-                word
+        # STEP A: Check the high-precision Glossary
+        # This is where your "Go -> Po" mapping lives
+        if glossary_matcher.loaded:
+            # In memory, one pass: longest terms first, including multi-word and short ones
+            glossary_hints.update(glossary_matcher.match(text))
+        elif words:
+            # Word-to-word, for all words in one query
+            glossary_rows = await conn.fetch(
+                """
+                SELECT lower(term_en) AS word, term_target FROM glossary_terms
+                WHERE lower(term_en) = ANY($1::text[])
+                """,
+                words
             )
-            
-            if glossary_match:
-                glossary_hints[word] = glossary_match['term_target']
-            else:
-                # STEP B: Fallback to Translation Memory (Sentence Search)
-                # This finds "jogging" inside "Kid is jogging"
-                tm_match = await conn.fetchrow(
-                    """
-                    SELECT target_text FROM translation_memory 
-                    WHERE source_text ILIKE $1 AND target_language = $2 AND brand_id = $3
+            for row in glossary_rows:
+                glossary_hints[row['word']] = row['term_target']
+
+        # STEP B: Fallback to Translation Memory (Sentence Search) for the words the glossary missed
+        # This finds "jogging" inside "Kid is jogging"; the trigram index serves the ILIKE
+        covered = {word for term in glossary_hints for word in re.findall(r'\w+', term)}
+        missing = [word for word in words if word not in covered]
+        if missing:
+            tm_rows = await conn.fetch(
+                """
+                SELECT w.word, tm.target_text
+                FROM unnest($1::text[]) AS w(word)
+                CROSS JOIN LATERAL (
+                    SELECT target_text FROM translation_memory
+                    WHERE source_text ILIKE '%' || w.word || '%' AND target_language = $2 AND brand_id = $3
                     LIMIT 1
-                    """,
-                    f"%{word}%", target_lang, brand_id
-                )
-                if tm_match:
-                    glossary_hints[word] = f"Context: {tm_match['target_text']}"
+                ) tm
+                """,
+                missing, target_lang, brand_id
+            )
+            for row in tm_rows:
+                glossary_hints[row['word']] = f"Context: {row['target_text']}"
 
         return {"matches": glossary_hints}
 
@@ -1211,23 +2039,79 @@ class GlossarySchema(BaseModel):
 #         )
 #         return {"status": "term_saved"}
 
+# Terms per INSERT ... SELECT FROM unnest(...) statement in bulk-sync.
+GLOSSARY_SYNC_CHUNK = int(os.getenv("GLOSSARY_SYNC_CHUNK", "5000"))
+
+async def _glossary_items(request: Request):
+    """Yields term objects from a JSON array body or, for application/x-ndjson, line by line as the body arrives."""
+    if "ndjson" in request.headers.get("content-type", ""):
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield json.loads(line)
+        if buffer.strip():
+            yield json.loads(buffer)
+    else:
+        body = await request.json()
+        if not isinstance(body, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of terms")
+        for item in body:
+            yield item
+
+async def _insert_glossary_batch(conn, batch: Dict[str, str]) -> List[Tuple[str, str]]:
+    """Inserts one batch in a single statement; returns the (term_en, term_target) pairs that were new."""
+    rows = await conn.fetch(
+        """
+        INSERT INTO glossary_terms (term_en, term_target)
+        SELECT * FROM unnest($1::text[], $2::text[])
+        ON CONFLICT (term_en) DO NOTHING
+        RETURNING term_en, term_target
+        """,
+        list(batch.keys()), list(batch.values())
+    )
+    return [(row['term_en'], row['term_target']) for row in rows]
+
 @app.post("/api/glossary/bulk-sync")
-async def bulk_sync_glossary(terms: list[dict]):
+async def bulk_sync_glossary(request: Request):
+    """
+    Accepts [{"en": ..., "target": ...}, ...] as a JSON array, or the same objects as
+    application/x-ndjson (one per line, may be streamed). All batches are written in one
+    transaction; terms that already exist are skipped.
+    """
     if pool is None:
         raise HTTPException(status_code=500, detail="Database pool not initialized")
-        
-    async with pool.acquire() as conn:
-        for item in terms:
-            # We save the English word in lowercase for easier matching later
-            await conn.execute(
-                """
-                INSERT INTO glossary_terms (term_en, term_target)
-                VALUES ($1, $2)
-                ON CONFLICT (term_en) DO NOTHING
-                """,
-                item['en'].lower().strip(), 
-                item['target'].strip()
-            )
-        return {"status": "success", "terms_indexed": len(terms)}
-    
-    
\ No newline at end of file
+
+    received = 0
+    inserted = []
+    try:
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                batch = {}
+                async for item in _glossary_items(request):
+                    try:
+                        # We save the English word in lowercase for easier matching later
+                        term_en, term_target = item['en'].lower().strip(), item['target'].strip()
+                    except (KeyError, TypeError, AttributeError):
+                        raise HTTPException(status_code=400, detail=f"Term {received + 1} needs string 'en' and 'target' fields")
+                    received += 1
+                    # Within one payload the first occurrence wins, as it would row by row.
+                    batch.setdefault(term_en, term_target)
+                    if len(batch) >= GLOSSARY_SYNC_CHUNK:
+                        inserted += await _insert_glossary_batch(conn, batch)
+                        batch = {}
+                if batch:
+                    inserted += await _insert_glossary_batch(conn, batch)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON: {e}")
+
+    await glossary_matcher.add_terms(inserted)
+    return {
+        "status": "success",
+        "terms_indexed": len(inserted),
+        "inserted": len(inserted),
+        "skipped": received - len(inserted),
+    }
+
@@ -0,0 +1,255 @@
+"""
+match-fragments: the batched glossary query, then one LATERAL translation-memory query for the
+words the glossary missed.
+
+The unit tests run against a recording stand-in for the connection, through both the in-memory
+glossary matcher and the SQL lookup used while it is not loaded. The Postgres tests run only
+when TEST_DATABASE_URL points at a scratch database; they work in a throwaway schema.
+Run from the repository root:
+    python -m pytest server/tests
+"""
+import os
+import uuid
+import asyncio
+import contextlib
+
+import pytest
+
+from server import main
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+
+class RecordingConnection:
+    """Answers fetch() from canned glossary and TM data and records every query."""
+
+    def __init__(self, glossary, tm):
+        self.glossary = glossary
+        self.tm = tm
+        self.queries = []
+
+    async def fetch(self, query, *args):
+        self.queries.append((query, args))
+        if "FROM glossary_terms" in query:
+            return [{"word": w, "term_target": self.glossary[w]} for w in args[0] if w in self.glossary]
+        if "FROM translation_memory" in query:
+            return [{"word": w, "target_text": self.tm[w]} for w in args[0] if w in self.tm]
+        raise AssertionError(f"unexpected query: {query}")
+
+
+class RecordingPool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    @contextlib.asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+
+@pytest.fixture
+def sql_path(monkeypatch):
+    """Routes match_fragments through the SQL glossary lookup (the in-memory matcher is not loaded)."""
+    monkeypatch.setattr(main, "glossary_matcher", main.GlossaryMatcher())
+
+    def install(glossary=None, tm=None):
+        conn = RecordingConnection(glossary or {}, tm or {})
+        monkeypatch.setattr(main, "pool", RecordingPool(conn))
+        return conn
+
+    return install
+
+
+def match(text, target_lang="fr", brand_id="b1"):
+    return asyncio.run(main.match_fragments(text=text, target_lang=target_lang, brand_id=brand_id))
+
+
+def test_glossary_lookup_is_one_query_for_all_words(sql_path):
+    conn = sql_path(glossary={"launch": "lancement"})
+    match("Launch the launch campaign in spring")
+
+    glossary_queries = [args for query, args in conn.queries if "FROM glossary_terms" in query]
+    assert len(glossary_queries) == 1
+    assert "= ANY($1::text[])" in conn.queries[0][0]
+    # Unique, lower-cased tokens of 3+ characters
+    assert sorted(glossary_queries[0][0]) == ["campaign", "launch", "spring", "the"]
+
+
+def test_response_shape_and_tm_context_prefix(sql_path):
+    sql_path(glossary={"launch": "lancement"}, tm={"campaign": "La campagne commence"})
+    assert match("Launch campaign") == {
+        "matches": {"launch": "lancement", "campaign": "Context: La campagne commence"}
+    }
+
+
+def test_only_glossary_misses_go_to_tm(sql_path):
+    conn = sql_path(glossary={"launch": "lancement"}, tm={"launch": "should not be used"})
+    result = match("launch campaign spring")
+
+    tm_queries = [args for query, args in conn.queries if "FROM translation_memory" in query]
+    assert len(tm_queries) == 1
+    missing, target_lang, brand_id = tm_queries[0]
+    assert sorted(missing) == ["campaign", "spring"]
+    assert (target_lang, brand_id) == ("fr", "b1")
+    assert result["matches"] == {"launch": "lancement"}
+
+
+def test_no_tm_query_when_glossary_covers_everything(sql_path):
+    conn = sql_path(glossary={"launch": "lancement", "spring": "printemps"})
+    assert match("launch spring") == {"matches": {"launch": "lancement", "spring": "printemps"}}
+    assert len(conn.queries) == 1
+
+
+def test_no_queries_without_words(sql_path):
+    conn = sql_path()
+    assert match("a b !!") == {"matches": {}}
+    assert conn.queries == []
+
+
+# --- In-memory glossary matcher (the default once loaded) ---
+@pytest.fixture
+def matcher_path(monkeypatch):
+    """Loads glossary_matcher from a term list; the connection only answers TM queries."""
+
+    def install(terms, tm=None):
+        matcher = main.GlossaryMatcher()
+        asyncio.run(matcher._build({main.normalize_term(term): target for term, target in terms.items()}))
+        monkeypatch.setattr(main, "glossary_matcher", matcher)
+        conn = RecordingConnection({}, tm or {})
+        monkeypatch.setattr(main, "pool", RecordingPool(conn))
+        return conn
+
+    return install
+
+
+GLOSSARY = {
+    "Launch": "lancement",
+    "launch event": "événement de lancement",
+    "HCP": "professionnel de santé",
+    "go": "po",
+}
+
+
+def test_matcher_sends_no_glossary_query(matcher_path):
+    conn = matcher_path(GLOSSARY)
+    assert match("launch") == {"matches": {"launch": "lancement"}}
+    assert not any("FROM glossary_terms" in query for query, _ in conn.queries)
+    # Every word was covered, so there is no TM query either
+    assert conn.queries == []
+
+
+def test_matcher_multi_word_and_leftmost_longest(matcher_path):
+    matcher_path(GLOSSARY)
+    # "launch event" wins over the "launch" it starts with; a later lone "launch" still matches
+    assert match("The Launch Event, then launch") == {
+        "matches": {"launch event": "événement de lancement", "launch": "lancement"}
+    }
+
+
+def test_matcher_whole_words_only(matcher_path):
+    conn = matcher_path(GLOSSARY)
+    assert match("relaunched ago") == {"matches": {}}
+    # Neither word was covered by the glossary, so both go to the TM query
+    (query, (missing, _, _)), = conn.queries
+    assert "FROM translation_memory" in query
+    assert sorted(missing) == ["ago", "relaunched"]
+
+
+def test_matcher_short_terms(matcher_path):
+    matcher_path(GLOSSARY)
+    # Terms shorter than the 3-character token minimum still match in memory
+    assert match("HCP go") == {"matches": {"hcp": "professionnel de santé", "go": "po"}}
+
+
+def test_matcher_covered_words_skip_tm(matcher_path):
+    conn = matcher_path(GLOSSARY, tm={"schedule": "calendrier", "event": "should not be used"})
+    result = match("launch event schedule")
+
+    tm_queries = [args for query, args in conn.queries if "FROM translation_memory" in query]
+    assert len(tm_queries) == 1
+    # "launch" and "event" are covered by the multi-word term
+    assert tm_queries[0][0] == ["schedule"]
+    assert result == {
+        "matches": {"launch event": "événement de lancement", "schedule": "Context: calendrier"}
+    }
+
+
+# --- Against Postgres ---
+requires_postgres = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL is not set")
+
+BRAND_ID = str(uuid.uuid4())
+OTHER_BRAND_ID = str(uuid.uuid4())
+
+
+async def _with_database(test):
+    """Runs test() with main.pool pointed at a fresh schema holding the two tables it reads."""
+    import asyncpg
+
+    schema = f"match_fragments_test_{uuid.uuid4().hex[:8]}"
+    admin = await asyncpg.connect(TEST_DATABASE_URL)
+    await admin.execute(f"CREATE SCHEMA {schema}")
+    try:
+        pool = await asyncpg.create_pool(TEST_DATABASE_URL, min_size=1, max_size=2, server_settings={"search_path": schema})
+        try:
+            async with pool.acquire() as conn:
+                await conn.execute(
+                    """
+                    CREATE TABLE glossary_terms (term_en text UNIQUE, term_target text);
+                    CREATE TABLE translation_memory (
+                        source_text text, target_text text, target_language text, brand_id uuid
+                    );
+                    """
+                )
+                await conn.executemany(
+                    "INSERT INTO glossary_terms VALUES ($1, $2)",
+                    [("Launch", "lancement"), ("Spring", "printemps")],
+                )
+                await conn.executemany(
+                    "INSERT INTO translation_memory VALUES ($1, $2, $3, $4)",
+                    [
+                        ("The launch event", "L'événement de lancement", "fr", BRAND_ID),
+                        ("Campaign starts now", "La campagne commence", "fr", BRAND_ID),
+                        ("Campaign starts now", "Die Kampagne beginnt", "de", BRAND_ID),
+                        ("Dosing schedule", "Posologie", "fr", OTHER_BRAND_ID),
+                    ],
+                )
+            main.pool = pool
+            await test()
+        finally:
+            await pool.close()
+    finally:
+        await admin.execute(f"DROP SCHEMA {schema} CASCADE")
+        await admin.close()
+
+
+@requires_postgres
+def test_postgres_glossary_and_tm_hints(monkeypatch):
+    monkeypatch.setattr(main, "glossary_matcher", main.GlossaryMatcher())
+    monkeypatch.setattr(main, "pool", None)
+
+    async def check():
+        result = await main.match_fragments(text="Launch the campaign, dosing in spring", target_lang="fr", brand_id=BRAND_ID)
+        assert result == {
+            "matches": {
+                # Glossary hits, matched case-insensitively
+                "launch": "lancement",
+                "spring": "printemps",
+                # TM hit for this brand and language only, with the Context: prefix
+                "campaign": "Context: La campagne commence",
+            }
+        }
+
+    asyncio.run(_with_database(check))
+
+
+@requires_postgres
+def test_postgres_glossary_words_skip_tm(monkeypatch):
+    monkeypatch.setattr(main, "glossary_matcher", main.GlossaryMatcher())
+    monkeypatch.setattr(main, "pool", None)
+
+    async def check():
+        # "launch" also matches a TM sentence; had it been sent to the TM query its
+        # "Context: ..." hint would have replaced the glossary one.
+        result = await main.match_fragments(text="launch", target_lang="fr", brand_id=BRAND_ID)
+        assert result == {"matches": {"launch": "lancement"}}
+
+    asyncio.run(_with_database(check))